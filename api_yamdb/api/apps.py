@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .connections import check_connections
+        if settings.DB_HEALTH_CHECKS:
+            request_started.connect(check_connections)
@@ -0,0 +1,351 @@
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from reviews.models import Title
+
+from . import references
+from .cache import invalidate
+from .deletion import remove_title
+from .serializers import SlugItemSerializer, TitleBulkSerializer
+from .signals import invalidate_titles
+
+GenreTitle = Title.genre.through
+BULK_STATUSES = {'post': 'created', 'patch': 'updated', 'delete': 'deleted'}
+EMPTY_MESSAGE = 'Ожидается непустой список объектов.'
+TOO_MANY_MESSAGE = 'Не больше {} объектов за один запрос.'
+NOT_FOUND_MESSAGE = 'Объект не найден.'
+REPEATED_MESSAGE = 'Объект уже указан в пакете.'
+DUPLICATE_MESSAGE = 'Объект с таким slug уже существует.'
+MISSING_MESSAGE = 'Объект с slug={} не существует.'
+REQUIRED_MESSAGE = 'Обязательное поле.'
+CONFLICT_MESSAGE = 'Конфликт при записи, изменения не сохранены.'
+
+
+def bulk_error(results, index, errors):
+    results[index] = {'index': index, 'status': 'error', 'errors': errors}
+
+
+class BulkWriteMixin:
+    """
+    Пакетные создание (POST), изменение (PATCH) и удаление (DELETE)
+    списка объектов одним запросом к `<ресурс>/bulk/`.
+
+    Сначала проверяются все элементы, связанные объекты ищутся одним
+    запросом на пакет, затем запись выполняется пакетными запросами
+    в одной транзакции. По умолчанию пакет применяется целиком или
+    не применяется вовсе; с `?atomic=false` корректные элементы
+    записываются, а ошибки возвращаются для каждого элемента отдельно.
+    """
+
+    bulk_lookup_field = 'slug'
+    bulk_key_field = serializers.SlugField
+
+    @action(
+        detail=False, methods=('post', 'patch', 'delete'), url_path='bulk'
+    )
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': [EMPTY_MESSAGE]})
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                TOO_MANY_MESSAGE.format(settings.BULK_MAX_ITEMS)
+            ]})
+        method = request.method.lower()
+        atomic = request.query_params.get('atomic', 'true').lower() not in (
+            '0', 'false'
+        )
+        results = [None] * len(items)
+        entries = getattr(self, f'bulk_prepare_{method}')(items, results)
+        if atomic and any(results):
+            for index, _ in entries:
+                results[index] = {'index': index, 'status': 'skipped'}
+            return Response(
+                {'results': results}, status=status.HTTP_400_BAD_REQUEST
+            )
+        self.bulk_write(method, entries, results, atomic)
+        if any(result['status'] == 'error' for result in results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif method == 'post':
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({'results': results}, status=response_status)
+
+    def bulk_write(self, method, entries, results, atomic):
+        """
+        Запись пакета одной транзакцией. Если в частичном режиме пакет
+        упал на ограничении целостности (например, slug заняли
+        параллельно), элементы записываются по одному, чтобы найти
+        виновные.
+        """
+        write = getattr(self, f'bulk_{method}')
+        try:
+            with transaction.atomic():
+                written = write(entries) if entries else []
+        except IntegrityError:
+            if atomic:
+                raise ValidationError({'non_field_errors': [CONFLICT_MESSAGE]})
+            written = []
+            for entry in entries:
+                try:
+                    with transaction.atomic():
+                        written += write([entry])
+                except IntegrityError:
+                    bulk_error(
+                        results, entry[0],
+                        {'non_field_errors': [CONFLICT_MESSAGE]}
+                    )
+        for index, key in written:
+            results[index] = {
+                'index': index, 'status': BULK_STATUSES[method], **key
+            }
+
+    def bulk_validate(self, items, results, serializer_class, **kwargs):
+        valid = []
+        for index, item in enumerate(items):
+            serializer = serializer_class(data=item, **kwargs)
+            if serializer.is_valid():
+                valid.append((index, dict(serializer.validated_data)))
+            else:
+                bulk_error(results, index, serializer.errors)
+        return valid
+
+    def bulk_unique(self, entries, results, get_key):
+        """
+        Повторное упоминание объекта в пакете — ошибка: итог записи
+        зависел бы от порядка элементов.
+        """
+        seen, unique = set(), []
+        for index, data in entries:
+            key = get_key(data)
+            if key in seen:
+                bulk_error(results, index, {
+                    self.bulk_lookup_field: [REPEATED_MESSAGE]
+                })
+                continue
+            seen.add(key)
+            unique.append((index, data))
+        return unique
+
+    def bulk_prepare_delete(self, items, results):
+        """Элементы пакета удаления — значения slug или id объектов."""
+        keys = []
+        for index, item in enumerate(items):
+            try:
+                key = self.bulk_key_field().run_validation(item)
+            except ValidationError as error:
+                bulk_error(results, index, error.detail)
+            else:
+                keys.append((index, key))
+        keys = self.bulk_unique(keys, results, lambda key: key)
+        existing = set(
+            self.get_queryset().model.objects.filter(**{
+                f'{self.bulk_lookup_field}__in': [key for _, key in keys]
+            }).values_list(self.bulk_lookup_field, flat=True)
+        )
+        entries = []
+        for index, key in keys:
+            if key in existing:
+                entries.append((index, key))
+            else:
+                bulk_error(results, index, {'detail': NOT_FOUND_MESSAGE})
+        return entries
+
+    def bulk_delete(self, entries):
+        self.get_queryset().model.objects.filter(**{
+            f'{self.bulk_lookup_field}__in': [key for _, key in entries]
+        }).delete()
+        return [
+            (index, {self.bulk_lookup_field: key}) for index, key in entries
+        ]
+
+
+class SlugBulkWriteMixin(BulkWriteMixin):
+    """Пакетная запись жанров и категорий."""
+
+    def bulk_prepare_post(self, items, results):
+        valid = self.bulk_validate(items, results, SlugItemSerializer)
+        existing = set(
+            self.get_queryset().model.objects.filter(
+                slug__in=[data['slug'] for _, data in valid]
+            ).values_list('slug', flat=True)
+        )
+        entries = []
+        for index, data in valid:
+            if data['slug'] in existing:
+                bulk_error(results, index, {'slug': [DUPLICATE_MESSAGE]})
+                continue
+            existing.add(data['slug'])
+            entries.append((index, data))
+        return entries
+
+    def bulk_post(self, entries):
+        model = self.get_queryset().model
+        model.objects.bulk_create([model(**data) for _, data in entries])
+        invalidate(*self.cache_families)
+        return [(index, {'slug': data['slug']}) for index, data in entries]
+
+    def bulk_prepare_patch(self, items, results):
+        valid = self.bulk_unique(
+            self.bulk_validate(items, results, SlugItemSerializer),
+            results, lambda data: data['slug']
+        )
+        instances = self.get_queryset().model.objects.in_bulk(
+            [data['slug'] for _, data in valid], field_name='slug'
+        )
+        entries = []
+        for index, data in valid:
+            instance = instances.get(data['slug'])
+            if instance is None:
+                bulk_error(results, index, {'detail': NOT_FOUND_MESSAGE})
+                continue
+            instance.name = data['name']
+            entries.append((index, instance))
+        return entries
+
+    def bulk_patch(self, entries):
+        model = self.get_queryset().model
+        instances = [instance for _, instance in entries]
+        model.objects.bulk_update(instances, ('name',))
+        invalidate(*self.cache_families)
+        # Имя модели совпадает с полем Title: genre или category.
+        invalidate_titles(**{f'{model._meta.model_name}__in': instances})
+        return [
+            (index, {'slug': instance.slug}) for index, instance in entries
+        ]
+
+
+class TitleBulkWriteMixin(BulkWriteMixin):
+    """
+    Пакетная запись произведений: жанры и категории всего пакета
+    ищутся в кэше справочников, связи с жанрами вставляются одним
+    запросом.
+    """
+
+    bulk_lookup_field = 'id'
+    bulk_key_field = serializers.IntegerField
+
+    def bulk_resolve(self, valid, results):
+        """Замена slug жанров и категории на id."""
+        genre_slugs, category_slugs = set(), set()
+        for _, data in valid:
+            genre_slugs.update(data.get('genre', ()))
+            if 'category' in data:
+                category_slugs.add(data['category'])
+        references.refresh_references()
+        genres = {
+            slug: row[0]
+            for slug, row in references.genres.get_many(
+                'slug', genre_slugs
+            ).items()
+        }
+        categories = {
+            slug: row[0]
+            for slug, row in references.categories.get_many(
+                'slug', category_slugs
+            ).items()
+        }
+        resolved = []
+        for index, data in valid:
+            errors = {}
+            missing = [
+                slug for slug in data.get('genre', ()) if slug not in genres
+            ]
+            if missing:
+                errors['genre'] = [MISSING_MESSAGE.format(s) for s in missing]
+            if 'category' in data and data['category'] not in categories:
+                errors['category'] = [MISSING_MESSAGE.format(data['category'])]
+            if errors:
+                bulk_error(results, index, errors)
+                continue
+            if 'genre' in data:
+                data['genre'] = list(
+                    dict.fromkeys(genres[slug] for slug in data['genre'])
+                )
+            if 'category' in data:
+                data['category'] = categories[data['category']]
+            resolved.append((index, data))
+        return resolved
+
+    def bulk_delete(self, entries):
+        for title in Title.objects.filter(id__in=[key for _, key in entries]):
+            remove_title(title)
+        return [(index, {'id': key}) for index, key in entries]
+
+    def set_fields(self, title, data):
+        for field, value in data.items():
+            if field != 'genre':
+                setattr(title, Title._meta.get_field(field).attname, value)
+
+    def bulk_prepare_post(self, items, results):
+        valid = self.bulk_validate(items, results, TitleBulkSerializer)
+        for _, data in valid:
+            data.pop('id', None)
+        return self.bulk_resolve(valid, results)
+
+    def bulk_post(self, entries):
+        titles = []
+        for _, data in entries:
+            title = Title()
+            self.set_fields(title, data)
+            titles.append(title)
+        features = connections[Title.objects.db].features
+        if features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+        else:
+            for title in titles:
+                title.save()
+        GenreTitle.objects.bulk_create([
+            GenreTitle(title_id=title.id, genre_id=genre_id)
+            for (_, data), title in zip(entries, titles)
+            for genre_id in data['genre']
+        ])
+        invalidate('titles')
+        return [
+            (index, {'id': title.id})
+            for (index, _), title in zip(entries, titles)
+        ]
+
+    def bulk_prepare_patch(self, items, results):
+        valid = []
+        for index, data in self.bulk_validate(
+            items, results, TitleBulkSerializer, partial=True
+        ):
+            if 'id' in data:
+                valid.append((index, data))
+            else:
+                bulk_error(results, index, {'id': [REQUIRED_MESSAGE]})
+        valid = self.bulk_unique(valid, results, lambda data: data['id'])
+        instances = Title.objects.in_bulk([data['id'] for _, data in valid])
+        entries = []
+        for index, data in self.bulk_resolve(valid, results):
+            title = instances.get(data.pop('id'))
+            if title is None:
+                bulk_error(results, index, {'detail': NOT_FOUND_MESSAGE})
+                continue
+            entries.append((index, (title, data)))
+        return entries
+
+    def bulk_patch(self, entries):
+        fields, genres = set(), {}
+        for _, (title, data) in entries:
+            if 'genre' in data:
+                genres[title.id] = data['genre']
+            self.set_fields(title, data)
+            fields.update(field for field in data if field != 'genre')
+        titles = [title for _, (title, _) in entries]
+        if fields:
+            Title.objects.bulk_update(titles, fields)
+        if genres:
+            GenreTitle.objects.filter(title_id__in=genres).delete()
+            GenreTitle.objects.bulk_create([
+                GenreTitle(title_id=title_id, genre_id=genre_id)
+                for title_id, genre_ids in genres.items()
+                for genre_id in genre_ids
+            ])
+        invalidate('titles', *(f'title:{title.id}' for title in titles))
+        return [(index, {'id': title.id}) for index, (title, _) in entries]
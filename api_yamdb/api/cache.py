@@ -0,0 +1,191 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from api_yamdb.routers import is_replica_read
+
+ALL_FAMILIES = 'all'
+VERSION_KEY = 'api:version:{}'
+MODIFIED_KEY = 'api:modified:{}'
+RESPONSE_KEY = 'api:response:{}:{}'
+PRECONDITION_HEADERS = ('HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def new_version():
+    """
+    Начальная версия семейства, если счётчик ещё не создан или вытеснен:
+    она не совпадает с версиями, под которыми лежат старые ответы.
+    """
+    return int(time.time() * 1000)
+
+
+def get_versions(families):
+    """
+    Текущие версии семейств ресурсов и время последнего изменения
+    любого из них за одно обращение к кэшу.
+    """
+    cache = get_cache()
+    defaults = {}
+    for family in families:
+        defaults[VERSION_KEY.format(family)] = new_version()
+        defaults[MODIFIED_KEY.format(family)] = int(time.time())
+    values = cache.get_many(defaults)
+    for key, default in defaults.items():
+        if key in values:
+            continue
+        if cache.add(key, default, timeout=None):
+            values[key] = default
+        else:
+            values[key] = cache.get(key, default)
+    versions = [values[VERSION_KEY.format(family)] for family in families]
+    last_modified = max(
+        values[MODIFIED_KEY.format(family)] for family in families
+    )
+    return versions, last_modified
+
+
+def bump_versions(families):
+    cache = get_cache()
+    for family in families:
+        key = VERSION_KEY.format(family)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), timeout=None)
+    modified = int(time.time())
+    cache.set_many(
+        {MODIFIED_KEY.format(family): modified for family in families},
+        timeout=None
+    )
+
+
+def invalidate(*families):
+    """
+    Сброс закэшированных ответов семейств ресурсов после фиксации
+    транзакции, чтобы в кэш не попали данные до записи.
+    """
+    transaction.on_commit(lambda: bump_versions(families))
+
+
+def invalidate_all():
+    invalidate(ALL_FAMILIES)
+
+
+class CachedResponseMixin:
+    """
+    Кэширование ответов list и retrieve и условные запросы к ним.
+
+    ETag и Last-Modified вычисляются по версиям семейств ресурсов,
+    от которых зависит ответ, без обращения к БД и без сериализации.
+    Ключ кэша дополнительно включает тип клиента (аноним или
+    аутентифицированный). Кэшируются только форматы cached_formats:
+    страница BrowsableAPI содержит имя вошедшего пользователя.
+    """
+
+    cache_families = ()
+    cached_formats = ('json', 'ndjson')
+
+    def get_cache_families(self):
+        return self.cache_families
+
+    def get_validators(self, request):
+        """ETag и время последнего изменения представления ресурса."""
+        versions, last_modified = get_versions(
+            (ALL_FAMILIES, *self.get_cache_families())
+        )
+        etag = md5(
+            f'{versions}|{request.accepted_media_type}|'
+            f'{request.get_full_path()}'.encode()
+        ).hexdigest()
+        return f'"{etag}"', last_modified
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format not in self.cached_formats:
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        conditional = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if conditional is not None:
+            return self.set_validators(conditional, etag, last_modified)
+        client = 'auth' if request.user.is_authenticated else 'anon'
+        key = RESPONSE_KEY.format(etag.strip('"'), client)
+        cached = get_cache().get(key)
+        if cached is not None:
+            content, content_type = cached
+            return self.set_validators(
+                HttpResponse(content, content_type=content_type),
+                etag, last_modified
+            )
+        settled = self.is_settled(last_modified)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and settled:
+            response.add_post_render_callback(
+                lambda rendered: self.store_response(key, rendered)
+            )
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def is_settled(self, last_modified):
+        """
+        Ответ, прочитанный с реплики сразу после изменения, может его
+        ещё не содержать: такой ответ не кэшируется и не получает ETag.
+        """
+        return (
+            not is_replica_read()
+            or time.time() - last_modified > settings.REPLICA_STICKY_SECONDS
+        )
+
+    def store_response(self, key, response):
+        get_cache().set(
+            key,
+            (response.content, response['Content-Type']),
+            settings.API_CACHE_TIMEOUT
+        )
+
+    def check_preconditions(self, request):
+        """
+        Проверка If-Match и If-Unmodified-Since перед изменением объекта:
+        оптимистичная блокировка против параллельных правок.
+        """
+        if not any(header in request.META for header in PRECONDITION_HEADERS):
+            return None
+        etag, last_modified = self.get_validators(request)
+        return get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        failed = self.check_preconditions(request)
+        if failed is not None:
+            return failed
+        return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        failed = self.check_preconditions(request)
+        if failed is not None:
+            return failed
+        return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,12 @@
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    """
+    Проверка постоянных соединений в начале запроса: соединение,
+    разорванное сервером или сетью, закрывается до первого обращения
+    к БД, и запрос открывает новое вместо ошибки.
+    """
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
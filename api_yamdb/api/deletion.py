@@ -0,0 +1,150 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+from reviews.models import Comment, Review, Title
+from reviews.signals import change_title_counters, get_trending_start
+from users.models import User
+
+from .cache import invalidate
+
+REVIEW_FIELDS = ('pk', 'title_id', 'score', 'pub_date')
+
+
+def get_batches(queryset, *fields):
+    """
+    Строки (pk, *fields) объектов queryset пачками по DELETE_BATCH_SIZE
+    в порядке pk.
+    """
+    last = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', *fields)[:settings.DELETE_BATCH_SIZE]
+        )
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def delete_rows(model, field, values):
+    """
+    Один DELETE ... WHERE field IN (values) без загрузки объектов и без
+    сигналов: счётчики и кэш ответов обновляет вызывающий код.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column = quote(model._meta.get_field(field).column)
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {column} IN ({placeholders})',
+            list(values)
+        )
+
+
+def delete_comments(queryset):
+    for rows in get_batches(queryset, 'review_id'):
+        with transaction.atomic():
+            delete_rows(Comment, 'id', [pk for pk, _ in rows])
+            invalidate(
+                *{f'comments:{review_id}' for _, review_id in rows},
+                *(f'comment:{pk}' for pk, _ in rows)
+            )
+
+
+def delete_reviews(queryset):
+    """
+    Удаление отзывов пачками: сначала комментарии к ним, затем отзывы
+    вместе с вычитанием их оценок из счётчиков произведений в одной
+    транзакции, поэтому счётчики верны после каждой пачки.
+    """
+    for batch in get_batches(queryset):
+        ids = [row[0] for row in batch]
+        delete_comments(Comment.objects.filter(review_id__in=ids))
+        with transaction.atomic():
+            rows = list(
+                Review.objects.select_for_update().filter(pk__in=ids)
+                .values_list(*REVIEW_FIELDS)
+            )
+            # Комментарии, добавленные после удаления пачки выше.
+            delete_rows(Comment, 'review', ids)
+            delete_rows(Review, 'id', ids)
+            change_counters(rows)
+            title_ids = {title_id for _, title_id, _, _ in rows}
+            invalidate(
+                'titles',
+                *(f'title:{title_id}' for title_id in title_ids),
+                *(f'reviews:{title_id}' for title_id in title_ids),
+                *(f'review:{pk}' for pk, _, _, _ in rows),
+                *(f'comments:{pk}' for pk, _, _, _ in rows)
+            )
+
+
+def change_counters(rows):
+    """Вычитание удалённых отзывов из счётчиков их произведений."""
+    trending_start = get_trending_start()
+    scores, trending = defaultdict(Counter), Counter()
+    for _, title_id, score, pub_date in rows:
+        scores[title_id][score] -= 1
+        trending[title_id] -= pub_date >= trending_start
+    for title_id, title_scores in scores.items():
+        change_title_counters(title_id, title_scores, trending[title_id])
+
+
+def delete_title(title):
+    delete_reviews(Review.objects.filter(title_id=title.pk))
+    title.delete()
+
+
+def delete_user(user):
+    delete_comments(Comment.objects.filter(author_id=user.pk))
+    delete_reviews(Review.objects.filter(author_id=user.pk))
+    user.delete()
+
+
+def delete_review(review):
+    delete_comments(Comment.objects.filter(review_id=review.pk))
+    review.delete()
+
+
+def remove_title(title):
+    """
+    Удаление произведения: сразу пачками или, при BACKGROUND_DELETE,
+    пометкой, после которой произведение скрыто из API, а удаляет его
+    с отзывами команда purge_deleted.
+    """
+    if not settings.BACKGROUND_DELETE:
+        delete_title(title)
+        return
+    Title.all_objects.filter(pk=title.pk).update(deleted=timezone.now())
+    invalidate('titles', f'title:{title.pk}', f'reviews:{title.pk}')
+
+
+def remove_user(user):
+    """
+    Удаление пользователя: сразу пачками или, при BACKGROUND_DELETE,
+    пометкой и блокировкой входа до запуска purge_deleted. До него
+    отзывы и комментарии пользователя видны в API, а оценки учтены
+    в рейтингах: их убирает только purge_deleted вместе с отзывами.
+    """
+    if not settings.BACKGROUND_DELETE:
+        delete_user(user)
+        return
+    user.deleted = timezone.now()
+    user.is_active = False
+    user.save(update_fields=('deleted', 'is_active'))
+
+
+def purge_deleted():
+    """Удаление помеченных произведений и пользователей."""
+    titles = Title.all_objects.exclude(deleted=None).order_by('deleted')
+    for title in titles:
+        delete_title(title)
+    users = User.objects.exclude(deleted=None).order_by('deleted')
+    for user in users:
+        delete_user(user)
+    return len(titles) + len(users)
@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitlesFilter(filters.FilterSet):
@@ -7,15 +8,14 @@ class TitlesFilter(filters.FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    search = filters.CharFilter(method='filter_search')
+    category = filters.CharFilter(field_name='category__slug')
+    genre = filters.CharFilter(field_name='genre__slug')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category',)
+        fields = ('name', 'year', 'genre', 'category', 'search')
+
+    def filter_search(self, queryset, name, value):
+        """Ранжированный полнотекстовый поиск по индексу."""
+        return search_titles(queryset, value)
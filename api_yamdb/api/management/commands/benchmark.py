@@ -0,0 +1,221 @@
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from reviews.models import Review
+
+from .loadtest import Client, percentile
+
+MIX_PATH = os.path.join(settings.BASE_DIR, 'benchmarks', 'mix.jsonl')
+BASELINE_PATH = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+SAMPLE_SIZE = 200
+
+
+def load_mix(path):
+    """Смесь запросов: по объекту JSON на строку с name, path и weight."""
+    with open(path, encoding='utf8') as mix_file:
+        entries = [json.loads(line) for line in mix_file if line.strip()]
+    if not entries:
+        raise CommandError(f'{path} has no requests')
+    return entries
+
+
+def sample_objects(size, seed):
+    """
+    Значения для подстановки в пути: отзывы выбираются по случайному id,
+    поэтому популярные произведения попадают в выборку чаще, как и
+    в реальных запросах.
+    """
+    reviews = Review.objects.select_related('title__category').order_by('pk')
+    last = reviews.last()
+    if last is None:
+        raise CommandError('No reviews: run generate_data or load_data first')
+    generator = random.Random(seed)
+    samples = []
+    for _ in range(size):
+        review = reviews.filter(pk__gte=generator.randint(1, last.pk)).first()
+        title = review.title
+        genre = title.genre.order_by().first()
+        samples.append({
+            'title': title.pk,
+            'review': review.pk,
+            'year': title.year,
+            'word': quote(title.name.split()[0]),
+            'category': title.category.slug if title.category else '',
+            'genre': genre.slug if genre else '',
+        })
+    return samples
+
+
+class MixClient(Client):
+    """Клиент, выбирающий запросы из смеси с заданными весами."""
+
+    def __init__(self, url, headers, deadline, mix, samples, seed):
+        super().__init__(url, headers, deadline)
+        self.mix = mix
+        self.weights = [entry.get('weight', 1) for entry in mix]
+        self.samples = samples
+        self.random = random.Random(seed)
+
+    def get_request(self):
+        entry = self.random.choices(self.mix, self.weights)[0]
+        path = entry['path'].format(**self.random.choice(self.samples))
+        return entry['name'], f'{self.url.path.rstrip("/")}{path}'
+
+
+def summarize(clients, elapsed):
+    latencies = defaultdict(list)
+    errors = Counter()
+    for client in clients:
+        for name, values in client.latencies.items():
+            latencies[name].extend(values)
+        errors.update(client.errors)
+    return {
+        name: {
+            'requests': len(latencies[name]),
+            'rps': round(len(latencies[name]) / elapsed, 1),
+            'p50': round(percentile(latencies[name], 0.5) * 1000, 1),
+            'p95': round(percentile(latencies[name], 0.95) * 1000, 1),
+            'p99': round(percentile(latencies[name], 0.99) * 1000, 1),
+            'errors': errors[name],
+        }
+        for name in sorted(set(latencies) | set(errors))
+    }
+
+
+def find_regressions(results, baseline, tolerance, slack):
+    """
+    Эндпоинты, у которых p95 или p99 выросли, а общая пропускная
+    способность упала больше допустимого относительно базовой линии.
+    """
+    regressions = []
+    for name, base in baseline['endpoints'].items():
+        current = results['endpoints'].get(name)
+        if current is None:
+            continue
+        for key in ('p95', 'p99'):
+            limit = base[key] * (1 + tolerance) + slack
+            if current[key] > limit:
+                regressions.append(
+                    f'{name}: {key} {current[key]} ms > {limit:.1f} ms'
+                )
+    limit = baseline['rps'] * (1 - tolerance)
+    if results['rps'] < limit:
+        regressions.append(f'throughput: {results["rps"]} rps < {limit:.1f}')
+    return regressions
+
+
+class Command(BaseCommand):
+    """
+    Бенчмарк запущенного сервера смесью запросов к API. Отчёт содержит
+    пропускную способность и p50/p95/p99 по каждому эндпоинту. Результат
+    можно сохранить как базовую линию, а при --check сравнить с ней
+    и завершиться ошибкой при регрессии.
+    """
+
+    help = 'Replays a weighted request mix and compares it with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Server root, e.g. http://localhost')
+        parser.add_argument('--mix', default=MIX_PATH)
+        parser.add_argument('--baseline', default=BASELINE_PATH)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Seconds of load.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--token', help='JWT sent with every request.')
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Store the results as the new baseline.'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Fail if the results regress against the baseline.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed relative regression.'
+        )
+        parser.add_argument(
+            '--slack', type=float, default=2,
+            help='Allowed absolute latency regression in milliseconds.'
+        )
+
+    def handle(self, *args, **options):
+        mix = load_mix(options['mix'])
+        samples = sample_objects(SAMPLE_SIZE, options['seed'])
+        headers = {'Accept': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f'Bearer {options["token"]}'
+        results = self.run_mix(mix, samples, headers, options)
+        self.report(results)
+        if options['save_baseline']:
+            with open(options['baseline'], 'w', encoding='utf8') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write(f'Baseline saved to {options["baseline"]}')
+        if options['check']:
+            self.compare(results, options)
+
+    def run_mix(self, mix, samples, headers, options):
+        started = time.monotonic()
+        deadline = started + options['duration']
+        clients = [
+            MixClient(
+                options['url'], headers, deadline, mix, samples,
+                options['seed'] + number
+            )
+            for number in range(options['concurrency'])
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.monotonic() - started
+        endpoints = summarize(clients, elapsed)
+        return {
+            'concurrency': options['concurrency'],
+            'rps': round(sum(
+                endpoint['rps'] for endpoint in endpoints.values()
+            ), 1),
+            'endpoints': endpoints,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"endpoint":24} {"requests":>8} {"rps":>8} {"p50 ms":>8} '
+            f'{"p95 ms":>8} {"p99 ms":>8} {"errors":>7}'
+        )
+        for name, endpoint in results['endpoints'].items():
+            self.stdout.write(
+                f'{name:24} {endpoint["requests"]:8d} {endpoint["rps"]:8.1f} '
+                f'{endpoint["p50"]:8.1f} {endpoint["p95"]:8.1f} '
+                f'{endpoint["p99"]:8.1f} {endpoint["errors"]:7d}'
+            )
+        self.stdout.write(
+            f'{results["rps"]:.1f} rps with {results["concurrency"]} clients'
+        )
+
+    def compare(self, results, options):
+        try:
+            with open(options['baseline'], encoding='utf8') as baseline_file:
+                baseline = json.load(baseline_file)
+        except FileNotFoundError:
+            raise CommandError(
+                f'No baseline at {options["baseline"]}: '
+                'run with --save-baseline first'
+            )
+        regressions = find_regressions(
+            results, baseline, options['tolerance'], options['slack']
+        )
+        if regressions:
+            raise CommandError(
+                'Performance regressions:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('No regressions'))
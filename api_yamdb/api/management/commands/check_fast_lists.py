@@ -0,0 +1,105 @@
+from urllib.parse import quote, urlsplit
+
+from django.core.management import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import Comment, Genre, Review, Title
+
+# Отдельный пустой кэш и нулевой таймаут: оба ответа должны быть
+# построены заново, а не взяты из кэша ответов.
+CHECK_SETTINGS = {
+    'ALLOWED_HOSTS': ['testserver'],
+    'API_CACHE_TIMEOUT': 0,
+    'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'check-fast-lists',
+    }},
+}
+
+
+def get_urls(limit):
+    urls = [
+        '/api/v1/titles/',
+        '/api/v1/titles/?page=2',
+        '/api/v1/titles/?pagination=cursor',
+        '/api/v1/titles/top/',
+        '/api/v1/titles/top/?pagination=cursor',
+        '/api/v1/titles/trending/',
+    ]
+    for title in Title.objects.order_by('-review_count')[:limit]:
+        urls.append(f'/api/v1/titles/?year={title.year}')
+        urls.append(
+            f'/api/v1/titles/?search={quote(title.name.split()[0])}'
+        )
+        urls.append(f'/api/v1/titles/{title.pk}/reviews/')
+        urls.append(f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor')
+    for genre in Genre.objects.all()[:limit]:
+        urls.append(f'/api/v1/titles/?genre={genre.slug}')
+    reviews = Review.objects.filter(
+        pk__in=Comment.objects.values('review')
+    ).order_by('pk')[:limit]
+    for review in reviews:
+        urls.append(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        )
+    return urls
+
+
+class Command(BaseCommand):
+    """
+    Проверка быстрого пути выдачи списков: для каждого адреса ответ
+    через сериализаторы и стандартный JSONRenderer должен побайтно
+    совпадать с ответом через .values() и FastJSONRenderer. Проверяются
+    и первая, и следующая страницы, в том числе по курсору.
+    """
+
+    help = 'Compares fast list responses with serializer output byte by byte'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=5,
+            help='Number of titles, genres and reviews checked.'
+        )
+
+    def handle(self, *args, **options):
+        client = APIClient(HTTP_ACCEPT='application/json')
+        mismatches = []
+        checked = 0
+        with override_settings(**CHECK_SETTINGS):
+            urls = get_urls(options['limit'])
+            while urls:
+                url = urls.pop(0)
+                expected, actual, next_url = self.compare(client, url)
+                checked += 1
+                if expected != actual:
+                    mismatches.append(url)
+                    self.stderr.write(
+                        f'{url}\n  serializer: {expected[:300]!r}\n'
+                        f'  fast:       {actual[:300]!r}'
+                    )
+                if next_url and 'page=' not in url and 'cursor=' not in url:
+                    urls.append(next_url)
+        if mismatches:
+            raise CommandError(
+                f'{len(mismatches)} of {checked} responses differ'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} responses are identical'
+        ))
+
+    def compare(self, client, url):
+        with override_settings(API_FAST_LISTS=False):
+            response = client.get(url)
+        expected = JSONRenderer().render(
+            response.data, 'application/json', {}
+        )
+        with override_settings(API_FAST_LISTS=True):
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned {response.status_code}')
+        next_url = response.data.get('next')
+        if next_url:
+            parts = urlsplit(next_url)
+            next_url = f'{parts.path}?{parts.query}'
+        return expected, response.content, next_url
@@ -0,0 +1,144 @@
+import http.client
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.core.management import BaseCommand, CommandError
+
+DEFAULT_CONCURRENCY = '1,2,4,8,16,32,64'
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+class Client(threading.Thread):
+    """Поток, отправляющий запросы по одному keep-alive соединению."""
+
+    def __init__(self, url, headers, deadline):
+        super().__init__(daemon=True)
+        self.url = urlsplit(url)
+        self.headers = headers
+        self.deadline = deadline
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+
+    def connect(self):
+        connection_class = (
+            http.client.HTTPSConnection if self.url.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        return connection_class(self.url.netloc, timeout=30)
+
+    def get_request(self):
+        """Имя, по которому учитывается запрос, и путь запроса."""
+        path = self.url.path or '/'
+        if self.url.query:
+            path = f'{path}?{self.url.query}'
+        return path, path
+
+    def run(self):
+        connection = self.connect()
+        while time.monotonic() < self.deadline:
+            name, path = self.get_request()
+            started = time.monotonic()
+            try:
+                connection.request('GET', path, headers=self.headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors[name] += 1
+                connection.close()
+                connection = self.connect()
+                continue
+            if response.status >= 400:
+                self.errors[name] += 1
+            else:
+                self.latencies[name].append(time.monotonic() - started)
+        connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест запущенного сервера: для каждого уровня
+    параллельности измеряются пропускная способность и p99 задержки.
+    Итог — наибольшая пропускная способность при p99 не выше заданного,
+    по которому сравниваются конфигурации сервера: тип воркеров, число
+    воркеров и потоков.
+    """
+
+    help = 'Measures throughput of a running server at a fixed p99 latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Absolute URL requested with GET.')
+        parser.add_argument(
+            '--concurrency', default=DEFAULT_CONCURRENCY,
+            help='Comma-separated numbers of parallel clients.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=10,
+            help='Seconds spent on each concurrency level.'
+        )
+        parser.add_argument(
+            '--p99', type=float, default=200,
+            help='Latency budget in milliseconds.'
+        )
+        parser.add_argument(
+            '--token', help='JWT sent in the Authorization header.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [
+                int(level) for level in options['concurrency'].split(',')
+            ]
+        except ValueError:
+            raise CommandError('--concurrency must list integers')
+        headers = {'Accept': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f'Bearer {options["token"]}'
+        best = None
+        self.stdout.write('clients      rps   p50 ms   p99 ms  errors')
+        for level in levels:
+            rps, p50, p99, errors = self.run_level(
+                options['url'], headers, level, options['duration']
+            )
+            self.stdout.write(
+                f'{level:7d} {rps:8.1f} {p50:8.1f} {p99:8.1f} {errors:7d}'
+            )
+            if p99 <= options['p99'] and (best is None or rps > best[1]):
+                best = (level, rps)
+        if best is None:
+            self.stdout.write(self.style.WARNING(
+                f'No level kept p99 under {options["p99"]:.0f} ms'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{best[1]:.1f} rps at p99 <= {options["p99"]:.0f} ms '
+            f'with {best[0]} clients'
+        ))
+
+    def run_level(self, url, headers, level, duration):
+        started = time.monotonic()
+        clients = [
+            Client(url, headers, started + duration) for _ in range(level)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.monotonic() - started
+        latencies = [
+            latency for client in clients
+            for values in client.latencies.values() for latency in values
+        ]
+        return (
+            len(latencies) / elapsed,
+            percentile(latencies, 0.5) * 1000,
+            percentile(latencies, 0.99) * 1000,
+            sum(sum(client.errors.values()) for client in clients),
+        )
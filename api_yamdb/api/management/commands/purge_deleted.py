@@ -0,0 +1,33 @@
+import time
+
+from api.deletion import purge_deleted
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Удаление произведений и пользователей, помеченных на удаление при
+    BACKGROUND_DELETE, вместе с их отзывами и комментариями пачками
+    по DELETE_BATCH_SIZE.
+    """
+
+    help = 'Deletes titles and users marked for deletion'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for marked objects instead of exiting.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=10,
+            help='Seconds between polls.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            purged = purge_deleted()
+            if purged:
+                self.stdout.write(f'{purged} objects deleted')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,102 @@
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter,
+                               Gauge, Histogram, generate_latest, multiprocess)
+
+from api_yamdb.postgresql_pool.base import get_pool_stats
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERIES = (0, 1, 2, 5, 10, 20, 50, 100)
+BYTES = (1000, 10000, 100000, 1000000)
+MULTIPROC_DIR = 'PROMETHEUS_MULTIPROC_DIR'
+
+# Имя метрики, описание и границы корзин гистограммы.
+HISTOGRAMS = (
+    ('duration_seconds', 'Request wall time, seconds.', SECONDS),
+    ('db_seconds', 'Time spent in database queries, seconds.', SECONDS),
+    ('serialize_seconds',
+     'Time spent building the response data outside database queries, '
+     'seconds.', SECONDS),
+    ('render_seconds', 'Response rendering time, seconds.', SECONDS),
+    ('queries', 'Database queries per request.', QUERIES),
+    ('response_bytes', 'Response body size, bytes.', BYTES),
+)
+COUNTERS = (
+    ('duplicate_queries', 'Repeated identical queries.'),
+)
+PREFIX = 'yamdb_request_'
+
+# С переменной окружения PROMETHEUS_MULTIPROC_DIR prometheus_client
+# хранит значения каждого процесса gunicorn в файлах этого каталога,
+# и любой процесс отдаёт их сумму. Без неё значения живут в памяти
+# процесса.
+registry = CollectorRegistry()
+histograms = {
+    name: Histogram(
+        f'{PREFIX}{name}', description, ('view',), buckets=buckets,
+        registry=registry
+    )
+    for name, description, buckets in HISTOGRAMS
+}
+counters = {
+    name: Counter(
+        f'{PREFIX}{name}', description, ('view',), registry=registry
+    )
+    for name, description in COUNTERS
+}
+# Пулы соединений у каждого процесса свои: в общем каталоге значения
+# хранятся с меткой pid живых процессов.
+pool_connections = Gauge(
+    'yamdb_db_pool_connections', 'Pooled database connections.',
+    ('alias', 'state'), registry=registry, multiprocess_mode='liveall'
+)
+pool_wait = Gauge(
+    'yamdb_db_pool_wait_seconds',
+    'Time spent waiting for a pooled connection.',
+    ('alias',), registry=registry, multiprocess_mode='liveall'
+)
+
+
+def record(view, values):
+    """Значения измеренного запроса к обработчику view."""
+    for name, histogram in histograms.items():
+        if values.get(name) is not None:
+            histogram.labels(view).observe(values[name])
+    for name, counter in counters.items():
+        counter.labels(view).inc(values.get(name, 0))
+    update_pools()
+
+
+def update_pools():
+    for alias, stats in get_pool_stats().items():
+        for state in ('in_use', 'idle'):
+            pool_connections.labels(alias, state).set(stats[state])
+        pool_wait.labels(alias).set(stats['wait_time_ms'] / 1000)
+
+
+def render():
+    """Текстовый формат экспозиции Prometheus."""
+    update_pools()
+    if MULTIPROC_DIR not in os.environ:
+        return generate_latest(registry)
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return generate_latest(collected)
+
+
+def metrics_view(request):
+    """
+    Метрики для Prometheus. Доступны только с токеном METRICS_TOKEN
+    в заголовке `Authorization: Bearer <токен>`.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    expected = f'Bearer {settings.METRICS_TOKEN}'
+    if not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), expected
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,209 @@
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+from . import metrics
+from .queries import RepeatedQueries
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+
+class QueryRecorder:
+    """
+    Время, число и повторы запросов к БД за время одного запроса
+    и время построения данных ответа без учёта запросов к БД.
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self.count = 0
+        self.duplicates = 0
+        self.seen = set()
+        self.serializing = 0
+        self.serialize_time = 0.0
+        self.serialize_db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        key = (sql, repr(params))
+        if key in self.seen:
+            self.duplicates += 1
+        else:
+            self.seen.add(key)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.time += elapsed
+            self.count += 1
+            if self.serializing:
+                self.serialize_db_time += elapsed
+
+    @contextmanager
+    def serialization(self):
+        self.serializing += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.serializing -= 1
+            if not self.serializing:
+                self.serialize_time += time.perf_counter() - started
+
+    @property
+    def serialize(self):
+        return self.serialize_time - self.serialize_db_time
+
+
+@contextmanager
+def serialization():
+    """
+    Построение данных ответа: сериализатор DRF или быстрый путь.
+    Вне измеряемого запроса ничего не делает.
+    """
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        yield
+        return
+    with recorder.serialization():
+        yield
+
+
+def instrument_serializers():
+    """
+    Замер BaseSerializer.data: представления DRF строят данные ответа
+    обращением к serializer.data внутри обработчика.
+    """
+    data = BaseSerializer.data.fget
+    if getattr(data, 'instrumented', False):
+        return
+
+    def timed_data(self):
+        with serialization():
+            return data(self)
+
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+def get_view_name(request):
+    """Имя обработчика вида TitleViewSet.list или ReviewViewSet.create."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.func.__name__
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+class InstrumentationMiddleware:
+    """
+    Измерение выборки запросов: общее время, время и число запросов
+    к БД, повторы одинаковых запросов, время сериализации и отрисовки
+    ответа и его размер. Значения отдаются в заголовке Server-Timing
+    и копятся в гистограммах для Prometheus. При METRICS_SAMPLE_RATE = 0
+    middleware отключается при старте и не стоит ничего.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        instrument_serializers()
+        self.get_response = get_response
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        request._render_time = None
+        started = time.perf_counter()
+        _local.recorder = recorder
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _local.recorder = None
+        duration = time.perf_counter() - started
+        render = request._render_time
+        size = None if response.streaming else len(response.content)
+        metrics.record(get_view_name(request), {
+            'duration_seconds': duration,
+            'db_seconds': recorder.time,
+            'serialize_seconds': recorder.serialize,
+            'render_seconds': render,
+            'queries': recorder.count,
+            'response_bytes': size,
+            'duplicate_queries': recorder.duplicates,
+        })
+        response['Server-Timing'] = self.get_server_timing(
+            duration, recorder, render
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Ответы DRF отрисовываются рендерером после обработчика, здесь
+        засекаем. Сериализация к этому времени уже выполнена.
+        """
+        if not hasattr(request, '_render_time'):
+            return response
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._render_time = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def get_server_timing(self, duration, recorder, render):
+        app = duration - recorder.time - recorder.serialize - (render or 0)
+        entries = [
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={recorder.time * 1000:.1f};desc="{recorder.count} '
+            f'queries, {recorder.duplicates} duplicates"',
+            f'serialize;dur={recorder.serialize * 1000:.1f}',
+        ]
+        if render is not None:
+            entries.append(f'render;dur={render * 1000:.1f}')
+        entries.append(f'app;dur={app * 1000:.1f}')
+        return ', '.join(entries)
+
+
+class RepeatedQueriesMiddleware:
+    """
+    Предупреждение в журнал о повторяющихся запросах к БД для стенда:
+    включается QUERY_CHECK=true и называет поле сериализатора,
+    из-за которого запрос повторяется.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_CHECK:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = RepeatedQueries()
+        with queries.watch():
+            response = self.get_response(request)
+        report = queries.get_report()
+        if report:
+            logger.warning(
+                'Повторяющиеся запросы в %s %s (%s, %s):\n%s',
+                request.method, request.path, get_view_name(request),
+                response.status_code, report
+            )
+        return response
@@ -1,7 +1,15 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework import filters, mixins, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from api_yamdb.routers import REPLICA, read_from_replica
 
 from .permissions import IsAdminOrReadOnly
 
+STICKY_KEY = 'db:primary:{}'
+
 
 class ListCreateDestroyViewSet(
     mixins.ListModelMixin,
@@ -13,3 +21,37 @@ class ListCreateDestroyViewSet(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+
+
+class ReplicaReadMixin:
+    """
+    Чтение безопасных запросов с реплики. После записи клиент
+    REPLICA_STICKY_SECONDS секунд читает с основной БД и видит
+    свои изменения, даже если реплика отстаёт.
+    """
+
+    def get_sticky_key(self, request):
+        if request.user.is_authenticated:
+            return STICKY_KEY.format(f'user:{request.user.pk}')
+        return STICKY_KEY.format(f'ip:{BaseThrottle().get_ident(request)}')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        read_from_replica(
+            REPLICA in settings.DATABASES
+            and request.method in SAFE_METHODS
+            and cache.get(self.get_sticky_key(request)) is None
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        read_from_replica(False)
+        if (
+            REPLICA in settings.DATABASES
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            cache.set(
+                self.get_sticky_key(request), True,
+                settings.REPLICA_STICKY_SECONDS
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,183 @@
+import json
+import math
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничная выдача по ключу (keyset): следующая страница выбирается
+    условием `(поле_1, ..., id) > (значения последнего объекта)` по
+    составному индексу, без OFFSET и без подсчёта общего количества.
+    """
+
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    # Границы целых значений курсора: большие числа СУБД не сравнивает.
+    max_cursor_int = 2 ** 63 - 1
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        reverse, position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(
+                    self.get_keyset_filter(position, reverse)
+                )
+            except (ValidationError, ValueError, TypeError):
+                self.fail_cursor()
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            ]
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Условие сравнения кортежей в виде, понятном любой СУБД.
+        Поля с префиксом `-` упорядочены по убыванию.
+        """
+        fields = [field.lstrip('-') for field in self.ordering]
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            equal = dict(zip(fields[:index], position[:index]))
+            condition |= Q(
+                **equal, **{f'{fields[index]}__{lookup}': position[index]}
+            )
+        return condition
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            # Строки быстрого пути выдачи — словари .values().
+            value = (
+                instance[name] if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def encode_cursor(self, reverse, position):
+        cursor = json.dumps({'r': reverse, 'p': position})
+        return replace_query_param(
+            self.base_url, self.cursor_query_param,
+            b64encode(cursor.encode()).decode()
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            cursor = json.loads(b64decode(encoded.encode()).decode())
+            reverse, position = bool(cursor['r']), cursor['p']
+        except (TypeError, ValueError, KeyError, BinasciiError):
+            self.fail_cursor()
+        if not isinstance(position, list) or (
+            len(position) != len(self.ordering)
+            or not all(self.is_valid_value(value) for value in position)
+        ):
+            self.fail_cursor()
+        return reverse, position
+
+    def is_valid_value(self, value):
+        if isinstance(value, float):
+            return math.isfinite(value)
+        if isinstance(value, int):
+            return abs(value) <= self.max_cursor_int
+        return isinstance(value, str)
+
+    def fail_cursor(self):
+        raise APIValidationError(
+            {self.cursor_query_param: [self.invalid_cursor_message]}
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, self.get_position(self.page[0]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    По умолчанию — постраничная выдача по номеру страницы.
+    Выдача по ключу включается параметром `?pagination=cursor`
+    или наличием курсора в запросе.
+    """
+
+    ordering = ('id',)
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def is_keyset_requested(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.keyset_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_keyset_requested(request):
+            self.paginator = KeysetPagination()
+            self.paginator.ordering = self.ordering
+        else:
+            self.paginator = PageNumberPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class TitlePagination(PageNumberOrKeysetPagination):
+    ordering = ('name', 'id')
+
+
+class ReviewCommentPagination(PageNumberOrKeysetPagination):
+    ordering = ('pub_date', 'id')
+
+
+class TopTitlePagination(PageNumberOrKeysetPagination):
+    ordering = ('-rating', 'id')
+
+
+class TrendingTitlePagination(PageNumberOrKeysetPagination):
+    ordering = ('-trending_count', 'id')
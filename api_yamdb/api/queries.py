@@ -0,0 +1,81 @@
+import re
+import sys
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import Serializer
+
+LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+TO_REPRESENTATION = Serializer.to_representation.__code__
+
+
+def fingerprint(sql):
+    """Форма запроса: литералы и списки IN заменены заполнителями."""
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_serializer_field(frame):
+    """
+    Поле сериализатора, при выводе которого выполняется запрос:
+    ближайший по стеку вызов Serializer.to_representation и его
+    текущее поле, например ReviewSerializer.author.
+    """
+    while frame is not None:
+        if frame.f_code is TO_REPRESENTATION and 'field' in frame.f_locals:
+            serializer = frame.f_locals['self']
+            field = frame.f_locals['field']
+            return f'{type(serializer).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+class RepeatedQueries:
+    """
+    Запросы одной формы, выполненные не меньше threshold раз за время
+    наблюдения, — признак N+1: связанные объекты догружаются по одному
+    при выводе каждой строки.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        self.counts = Counter()
+        self.fields = defaultdict(set)
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = fingerprint(sql)
+        self.counts[shape] += 1
+        field = get_serializer_field(sys._getframe(1))
+        if field is not None:
+            self.fields[shape].add(field)
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def watch(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def get_repeated(self):
+        return [
+            (shape, count, sorted(self.fields[shape]))
+            for shape, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+    def get_report(self):
+        lines = []
+        for shape, count, fields in self.get_repeated():
+            source = ', '.join(fields) or 'вне сериализатора'
+            lines.append(f'{count} раз ({source}): {shape}')
+        return '\n'.join(lines)
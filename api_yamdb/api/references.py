@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from reviews.models import Category, Genre
+
+from .cache import ALL_FAMILIES, get_versions
+
+ROW_FIELDS = ('id', 'name', 'slug')
+
+
+class LRUCache:
+    """
+    Словарь ограниченного размера: лишними вытесняются давние ключи.
+    Каждая очистка начинает новое поколение.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is not None:
+                self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation=None):
+        """Значение, прочитанное до очистки (generation), не сохраняется."""
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.generation += 1
+
+
+class ReferenceCache:
+    """
+    Справочник (жанры или категории) в памяти процесса: строки
+    (id, name, slug) по slug и по id. Запись справочника повышает версию
+    его семейства в кэше API; увидев новую версию, процесс очищает свою
+    копию. Версия общая для процессов только при общем CACHE_BACKEND,
+    поэтому копия в любом случае живёт не дольше REFERENCE_CACHE_TIMEOUT.
+    """
+
+    def __init__(self, model, family):
+        self.model = model
+        self.family = family
+        self.rows = LRUCache(settings.REFERENCE_CACHE_SIZE)
+        self.version = None
+        self.loaded = 0
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются вместе с аргументами, а кэш
+        # должен оставаться одним на процесс.
+        return self
+
+    def set_version(self, version):
+        now = time.monotonic()
+        expired = now - self.loaded > settings.REFERENCE_CACHE_TIMEOUT
+        if expired or version != self.version:
+            self.rows.clear()
+            self.version = version
+            self.loaded = now
+
+    def get_many(self, field, values):
+        """Строки по значениям поля slug или id, без отсутствующих в БД."""
+        rows, missing = {}, []
+        for value in values:
+            row = self.rows.get((field, value))
+            if row is None:
+                missing.append(value)
+            else:
+                rows[value] = row
+        if missing:
+            # Другой поток может очистить кэш, увидев новую версию, пока
+            # идёт запрос: строки, прочитанные до изменения справочника,
+            # в кэш после очистки не попадают.
+            generation = self.rows.generation
+            # Только основная БД: строка с отстающей реплики осталась бы
+            # в кэше до следующего изменения справочника.
+            for row in self.model.objects.using(DEFAULT_DB_ALIAS).filter(
+                **{f'{field}__in': missing}
+            ).values_list(*ROW_FIELDS):
+                self.rows.set(('id', row[0]), row, generation)
+                self.rows.set(('slug', row[2]), row, generation)
+                rows[row[ROW_FIELDS.index(field)]] = row
+        return rows
+
+    def get(self, field, value):
+        return self.get_many(field, (value,)).get(value)
+
+    def get_object(self, field, value):
+        """Объект модели, собранный из строки кэша без запроса к БД."""
+        row = self.get(field, value)
+        if row is None:
+            return None
+        return self.model.from_db(DEFAULT_DB_ALIAS, ROW_FIELDS, row)
+
+
+genres = ReferenceCache(Genre, 'genres')
+categories = ReferenceCache(Category, 'categories')
+
+
+def refresh_references():
+    """
+    Сверка версий справочников с кэшем API одним обращением; вызывается
+    раз за запрос, дальше строки читаются из памяти.
+    """
+    versions, _ = get_versions(
+        (ALL_FAMILIES, genres.family, categories.family)
+    )
+    genres.set_version((versions[0], versions[1]))
+    categories.set_version((versions[0], versions[2]))
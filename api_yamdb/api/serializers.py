@@ -1,10 +1,17 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.stats import get_weighted_rating
+from reviews.validators import validate_slug
 from users.mixins import UsernameValidatorMixin
 from users.models import User
 
+from . import references
+
 
 class UserSerializer(serializers.ModelSerializer, UsernameValidatorMixin):
     class Meta:
@@ -57,32 +64,165 @@ class GenreSerializer(serializers.ModelSerializer):
         }
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class ManyReferenceSlugField(serializers.ManyRelatedField):
+    """Список slug: промахи кэша справочника читаются одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child_relation.references.get_many('slug', [
+                str(item) for item in data if isinstance(item, (str, int))
+            ])
+        return super().to_internal_value(data)
+
+
+class ReferenceSlugField(serializers.SlugRelatedField):
+    """Жанр или категория по slug из кэша справочника."""
+
+    def __init__(self, references, **kwargs):
+        self.references = references
+        kwargs['slug_field'] = 'slug'
+        kwargs.setdefault('queryset', references.model.objects.all())
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManyReferenceSlugField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        instance = self.references.get_object('slug', str(data))
+        if instance is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field, value=data
+            )
+        return instance
+
+
+class ReferenceField(serializers.RelatedField):
+    """{'name', 'slug'} жанра или категории по id из кэша справочника."""
+
+    def __init__(self, references, **kwargs):
+        self.references = references
+        super().__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_representation(self, value):
+        row = self.references.get('id', value.pk)
+        if row is None:
+            return None
+        _, name, slug = row
+        return {'name': name, 'slug': slug}
+
+
+class ReferenceCacheMixin:
+    """Сверка версий справочников при создании сериализатора."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        references.refresh_references()
+
+
+class TitleSerializer(ReferenceCacheMixin, serializers.ModelSerializer):
     """Описание сериализатора для модели Title."""
 
-    genre = serializers.SlugRelatedField(many=True, slug_field='slug',
-                                         queryset=Genre.objects.all())
-    category = serializers.SlugRelatedField(slug_field='slug',
-                                            queryset=Category.objects.all())
+    genre = ReferenceSlugField(references.genres, many=True)
+    category = ReferenceSlugField(references.categories)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = Title.SERVICE_FIELDS
 
     def to_representation(self, instance):
         return ReadOnlyTitleSerializer(instance).data
 
 
-class ReadOnlyTitleSerializer(serializers.ModelSerializer):
+class SlugItemSerializer(serializers.Serializer):
+    """Элемент пакетного запроса к жанрам и категориям."""
+
+    name = serializers.CharField(
+        max_length=settings.MAX_LIMIT_CATEGORYGENRY_NAME)
+    slug = serializers.SlugField(
+        max_length=settings.MAX_LIMIT_CATEGORYGENRY_SLUG,
+        validators=(validate_slug,))
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """
+    Элемент пакетного запроса к произведениям: slug жанров и категории
+    проверяются одним запросом на весь пакет, а не для каждого элемента.
+    """
+
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        exclude = Title.SERVICE_FIELDS
+
+
+def load_references(titles):
+    """
+    Жанры и категории произведений в кэш справочников: по одному
+    запросу на справочник вместо запроса на каждый промах.
+    """
+    prefetch_related_objects(titles, 'genre')
+    references.genres.get_many(
+        'id', {genre.pk for title in titles for genre in title.genre.all()}
+    )
+    references.categories.get_many(
+        'id', {title.category_id for title in titles} - {None}
+    )
+
+
+class ReadOnlyTitleListSerializer(serializers.ListSerializer):
+    """Список произведений, справочники загружаются на всю страницу."""
+
+    def to_representation(self, data):
+        titles = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        load_references(titles)
+        return super().to_representation(titles)
+
+
+class ReadOnlyTitleSerializer(
+    ReferenceCacheMixin, serializers.ModelSerializer
+):
     """Описание сериализатора для 'list' и 'retrieve'"""
     rating = serializers.IntegerField(read_only=True)
-    genre = GenreSerializer(many=True)
-    category = CategoriesSerializer()
+    weighted_rating = serializers.SerializerMethodField()
+    genre = ReferenceField(references.genres, many=True, read_only=True)
+    category = ReferenceField(references.categories, read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            ('review_count', 'score_sum', 'trending_count', 'deleted')
+            + Title.HISTOGRAM_FIELDS
+        )
         read_only_fields = ('__all__',)
+        list_serializer_class = ReadOnlyTitleListSerializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not settings.TITLE_WEIGHTED_RATING:
+            del fields['weighted_rating']
+        return fields
+
+    def to_representation(self, instance):
+        load_references((instance,))
+        return super().to_representation(instance)
+
+    def get_weighted_rating(self, obj):
+        return get_weighted_rating(obj.score_sum, obj.review_count)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -105,17 +245,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('title',)
 
-    def validate(self, data):
-        """Проверка существования произведения."""
-        if self.context['request'].method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            author = self.context['request'].user
-            if Review.objects.filter(title=title_id, author=author).exists():
-                raise serializers.ValidationError(
-                    'Можно написать только одну рецензию на произведение.'
-                )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     """Описание сериализатора для модели Comment."""
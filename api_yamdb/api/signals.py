@@ -0,0 +1,90 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+from .cache import ALL_FAMILIES, invalidate
+
+
+def invalidate_titles(**lookup):
+    """
+    Сброс ответов о произведениях, ссылающихся на изменённые жанры
+    или категории: ETag произведения зависит только от его семейства.
+    """
+    invalidate(*(
+        f'title:{pk}'
+        for pk in Title.all_objects.filter(**lookup).values_list(
+            'pk', flat=True
+        )
+    ))
+
+
+# Удаление обрабатывается до него: после удаления связи с
+# произведениями уже не найти.
+@receiver((post_save, pre_delete), sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate('categories')
+    invalidate_titles(category=instance)
+
+
+@receiver((post_save, pre_delete), sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    invalidate('genres')
+    invalidate_titles(genre=instance)
+
+
+@receiver((post_save, post_delete), sender=Title)
+def title_changed(sender, instance, signal, **kwargs):
+    families = ['titles', f'title:{instance.pk}']
+    if signal is post_delete:
+        families.append(f'reviews:{instance.pk}')
+    invalidate(*families)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        title_ids = (instance.pk,)
+    elif pk_set is not None:
+        title_ids = pk_set
+    else:
+        # Полная очистка жанра затрагивает неизвестные произведения,
+        # поэтому сбрасываются все их версии.
+        invalidate('titles', ALL_FAMILIES)
+        return
+    invalidate('titles', *(f'title:{pk}' for pk in title_ids))
+
+
+@receiver((post_save, post_delete), sender=Review)
+def review_changed(sender, instance, signal, **kwargs):
+    """Отзыв меняет и список отзывов, и рейтинг произведения."""
+    families = [
+        'titles', f'title:{instance.title_id}',
+        f'reviews:{instance.title_id}', f'review:{instance.pk}',
+    ]
+    if signal is post_delete:
+        families.append(f'comments:{instance.pk}')
+    invalidate(*families)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    invalidate(f'comments:{instance.review_id}', f'comment:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """Новое имя автора должно появиться в отзывах и комментариях."""
+    loaded_username = getattr(instance, 'loaded_username', None)
+    if not created and instance.username != loaded_username:
+        invalidate('users')
+    instance.loaded_username = instance.username
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate('users')
@@ -0,0 +1,56 @@
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+
+from .renderers import NDJSONRenderer
+
+STREAM_PARAM = 'stream'
+STREAM_VALUES = ('1', 'true')
+
+
+class StreamingListMixin:
+    """
+    Выгрузка всего списка одним ответом: `?format=ndjson&stream=1`.
+    Строки читаются через .iterator() (на PostgreSQL — серверным
+    курсором) пачками по STREAM_CHUNK_SIZE, каждая пачка собирается
+    быстрым путём выдачи и сразу отправляется клиенту, поэтому память
+    не растёт с размером выгрузки. Фильтры списка применяются,
+    постраничная выдача и кэш ответов — нет.
+    """
+
+    renderer_classes = (
+        *api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer
+    )
+
+    def is_streaming(self, request):
+        return (
+            request.accepted_renderer.format == NDJSONRenderer.format
+            and request.query_params.get(STREAM_PARAM) in STREAM_VALUES
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_streaming(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # БД выбирается сейчас: генератор выполняется уже после
+        # finalize_response, когда признак чтения с реплики сброшен.
+        queryset = queryset.using(queryset.db)
+        return StreamingHttpResponse(
+            self.stream(queryset, request.accepted_renderer),
+            content_type=NDJSONRenderer.media_type
+        )
+
+    def stream(self, queryset, renderer):
+        rows = queryset.prefetch_related(None).values(
+            *self.fast_values
+        ).iterator(chunk_size=settings.STREAM_CHUNK_SIZE)
+        while True:
+            chunk = list(islice(rows, settings.STREAM_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield b''.join(
+                renderer.render_line(item)
+                for item in self.get_fast_data(chunk)
+            )
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+BUCKET_KEY = 'throttle:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> вместимость 10 и пополнение 10/60 токена в секунду."""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def take_token(state, capacity, refill, now):
+    """Новое состояние ведра и время ожидания, если токенов нет."""
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class LocalBuckets:
+    """
+    Вёдра в памяти процесса для одного узла: все операции O(1),
+    при переполнении вытесняются давно не использованные вёдра.
+    """
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, refill):
+        with self.lock:
+            state, wait = take_token(
+                self.buckets.get(key), capacity, refill, time.monotonic()
+            )
+            self.buckets[key] = state
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > settings.THROTTLE_MAX_BUCKETS:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+class CacheBuckets:
+    """
+    Вёдра в общем кэше для нескольких узлов. Чтение и запись
+    не атомарны, при одновременных запросах лимит приблизительный.
+    """
+
+    def consume(self, key, capacity, refill):
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        state, wait = take_token(cache.get(key), capacity, refill, time.time())
+        cache.set(key, state, timeout=int(capacity / refill) + 1)
+        return wait
+
+
+BACKENDS = {
+    'local': LocalBuckets,
+    'cache': CacheBuckets,
+}
+_buckets = {}
+
+
+def get_buckets():
+    backend = settings.THROTTLE_BACKEND
+    if backend not in _buckets:
+        _buckets[backend] = BACKENDS[backend]()
+    return _buckets[backend]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов алгоритмом token bucket: запрос берёт
+    по токену из ведра каждого своего идентификатора и отклоняется,
+    если хотя бы одно ведро пусто. Проверка выполняется до обработчика,
+    то есть до запросов к БД и проверки кода подтверждения.
+    """
+
+    scope = None
+
+    def get_idents(self, request, view):
+        return (f'ip:{self.get_ident(request)}',)
+
+    def allow_request(self, request, view):
+        self.wait_time = 0
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        capacity, refill = parse_rate(rate)
+        buckets = get_buckets()
+        for ident in self.get_idents(request, view):
+            key = BUCKET_KEY.format(
+                self.scope, md5(ident.encode()).hexdigest()
+            )
+            self.wait_time = max(
+                self.wait_time, buckets.consume(key, capacity, refill)
+            )
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class AuthThrottle(TokenBucketThrottle):
+    """Вёдра по IP и по имени пользователя из тела запроса."""
+
+    def get_idents(self, request, view):
+        idents = list(super().get_idents(request, view))
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if username:
+            idents.append(f'username:{username}')
+        return idents
+
+
+class SignUpThrottle(AuthThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(AuthThrottle):
+    scope = 'token'
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Изменение данных: ведро на пользователя, для анонимов — на IP."""
+
+    scope = 'write'
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+    def get_idents(self, request, view):
+        if request.user.is_authenticated:
+            return (f'user:{request.user.pk}',)
+        return super().get_idents(request, view)
@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoriesViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, SignUpView, TitleViewSet, TokenView,
-                    UserViewSet)
+from .metrics import metrics_view
+from .views import (CategoriesViewSet, CommentViewSet, DatabaseMetricsView,
+                    GenreViewSet, ReviewViewSet, SignUpView, TitleViewSet,
+                    TokenView, UserViewSet)
 
 app_name = 'api'
 
@@ -30,4 +31,6 @@ auth_urls = [
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(auth_urls)),
+    path('v1/metrics/', metrics_view, name='metrics'),
+    path('v1/metrics/db/', DatabaseMetricsView.as_view(), name='metrics-db'),
 ]
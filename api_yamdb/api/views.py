@@ -1,45 +1,66 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from reviews.stats import STATS_FIELDS, get_stats
+from users.authentication import as_model, get_access_token
+from users.models import OutgoingEmail, User
 
+from api_yamdb.postgresql_pool.base import get_pool_stats
+
+from .bulk import SlugBulkWriteMixin, TitleBulkWriteMixin
+from .cache import CachedResponseMixin
+from .deletion import delete_review, remove_title, remove_user
+from .fast import CommentFastListMixin, ReviewFastListMixin, TitleFastListMixin
 from .filters import TitlesFilter
-from .mixins import ListCreateDestroyViewSet
+from .mixins import ListCreateDestroyViewSet, ReplicaReadMixin
+from .pagination import (ReviewCommentPagination, TitlePagination,
+                         TopTitlePagination, TrendingTitlePagination)
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAuthorModeratorAdminOrReadOnly)
 from .serializers import (CategoriesSerializer, CommentSerializer,
                           GenreSerializer, ReadOnlyTitleSerializer,
                           ReviewSerializer, SignUpSerializer, TitleSerializer,
                           TokenSerializer, UserSerializer)
+from .streaming import StreamingListMixin
+from .throttling import SignUpThrottle, TokenThrottle
+
+READ_ACTIONS = ('list', 'retrieve', 'top', 'trending')
+ONE_REVIEW_MESSAGE = 'Можно написать только одну рецензию на произведение.'
+IDS_MESSAGE = 'Укажите id произведений через запятую.'
+TOO_MANY_IDS_MESSAGE = 'Не больше {} произведений за запрос.'
 
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted=None)
     permission_classes = (IsAdmin,)
     serializer_class = UserSerializer
     search_fields = ('username',)
     lookup_field = 'username'
 
+    def perform_destroy(self, instance):
+        remove_user(instance)
+
     @action(
         detail=False,
         methods=('GET', 'PATCH'),
         permission_classes=(IsAuthenticated,))
     def me(self, request):
-        serializer = UserSerializer(request.user)
+        user = get_object_or_404(User, pk=request.user.pk)
+        serializer = UserSerializer(user)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True)
             serializer.is_valid(raise_exception=True)
@@ -48,23 +69,25 @@ class UserViewSet(viewsets.ModelViewSet):
 
 
 class SignUpView(APIView):
+    throttle_classes = (SignUpThrottle,)
+
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data.get('email')
         username = serializer.validated_data.get('username')
         try:
-            user, is_created = User.objects.get_or_create(
+            user, is_created = User.objects.filter(deleted=None).get_or_create(
                 email=email,
                 username=username)
         except IntegrityError:
             raise ValidationError(detail='Username или Email уже занят.')
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        OutgoingEmail.objects.create(
             subject='Ваш код под подтверждения: ',
             message=f'Код подтверждения - "{confirmation_code}".',
             from_email=settings.FROM_EMAIL,
-            recipient_list=(email,))
+            recipient=email)
         return Response(
             {'email': email, 'username': username},
             status=status.HTTP_200_OK)
@@ -72,18 +95,19 @@ class SignUpView(APIView):
 
 class TokenView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenThrottle,)
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         confirmation_code = serializer.validated_data.get('confirmation_code')
         username = serializer.validated_data.get('username')
-        user = get_object_or_404(User, username=username)
+        user = get_object_or_404(User, username=username, deleted=None)
 
         if default_token_generator.check_token(user, confirmation_code):
             user.is_active = True
             user.save()
-            token = AccessToken.for_user(user)
+            token = get_access_token(user)
             return Response({'token': f'{token}'}, status=status.HTTP_200_OK)
 
         return Response(
@@ -91,83 +115,238 @@ class TokenView(APIView):
             status=status.HTTP_400_BAD_REQUEST)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class DatabaseMetricsView(APIView):
+    """Занятость пулов соединений с БД в процессе, ответившем на запрос."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response({
+            'conn_max_age': settings.DATABASES['default']['CONN_MAX_AGE'],
+            'pools': get_pool_stats(),
+        })
+
+
+class GenreViewSet(
+    ReplicaReadMixin, SlugBulkWriteMixin, CachedResponseMixin,
+    ListCreateDestroyViewSet
+):
     """Вьюсет для запросов к объектам Genre."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_families = ('genres',)
 
 
-class CategoriesViewSet(ListCreateDestroyViewSet):
+class CategoriesViewSet(
+    ReplicaReadMixin, SlugBulkWriteMixin, CachedResponseMixin,
+    ListCreateDestroyViewSet
+):
     """Вьюсет для запросов к объектам Category."""
 
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
+    cache_families = ('categories',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ReplicaReadMixin, StreamingListMixin, TitleBulkWriteMixin,
+    CachedResponseMixin, TitleFastListMixin, viewsets.ModelViewSet
+):
     """Вьюсет для запросов к объектам Title."""
 
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = TitlePagination
     filterset_class = (filters.OrderingFilter,)
     ordering_fields = ('name',)
     filterset_class = TitlesFilter
 
+    def get_cache_families(self):
+        if not self.detail:
+            return ('titles', 'genres', 'categories')
+        # Изменение жанра или категории сбрасывает семейства только
+        # ссылающихся на них произведений (см. signals.invalidate_titles).
+        return (f'title:{self.kwargs.get("pk")}',)
+
+    def get_queryset(self):
+        """
+        Подгрузка id жанров, которые читает сериализатор: названия
+        жанров и категории берутся из кэша справочников.
+        """
+        if self.action in READ_ACTIONS:
+            return Title.objects.prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.only('id'))
+            )
+        return Title.objects.all()
+
     def get_serializer_class(self):
-        if self.action in ('retrieve', 'list'):
+        if self.action in READ_ACTIONS:
             return ReadOnlyTitleSerializer
         return TitleSerializer
 
+    def perform_destroy(self, instance):
+        remove_title(instance)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, pagination_class=TopTitlePagination)
+    def top(self, request):
+        """Произведения с наибольшим рейтингом."""
+        return self.cached_response(
+            self.leaderboard, request,
+            Q(rating__isnull=False),
+            ('-rating', 'id')
+        )
+
+    @action(detail=False, pagination_class=TrendingTitlePagination)
+    def trending(self, request):
+        """Произведения с наибольшим числом отзывов за последние дни."""
+        return self.cached_response(
+            self.leaderboard, request,
+            Q(trending_count__gt=0),
+            ('-trending_count', 'id')
+        )
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Гистограмма оценок, среднее, медиана и взвешенный рейтинг."""
+        return self.cached_response(self.title_stats, request, pk)
+
+    @action(detail=False, url_path='stats')
+    def bulk_stats(self, request):
+        """Статистика оценок произведений из `?ids=1,2,3` одним запросом."""
+        return self.cached_response(self.titles_stats, request)
+
+    def title_stats(self, request, pk):
+        row = Title.objects.filter(pk=pk).values(*STATS_FIELDS).first()
+        if row is None:
+            raise NotFound
+        return Response(get_stats(row))
+
+    def titles_stats(self, request):
+        try:
+            ids = [
+                int(value)
+                for value in request.query_params.get('ids', '').split(',')
+            ]
+        except ValueError:
+            raise ValidationError({'ids': [IDS_MESSAGE]})
+        if len(ids) > settings.STATS_MAX_IDS:
+            raise ValidationError({
+                'ids': [TOO_MANY_IDS_MESSAGE.format(settings.STATS_MAX_IDS)]
+            })
+        rows = Title.objects.filter(pk__in=ids).values(*STATS_FIELDS)
+        stats = {row['id']: get_stats(row) for row in rows}
+        return Response({
+            'results': [stats[pk] for pk in dict.fromkeys(ids) if pk in stats]
+        })
+
+    def leaderboard(self, request, condition, ordering):
+        """
+        Выдача по сохранённым счётчикам и частичному индексу:
+        стоимость чтения зависит от размера страницы, а не от числа отзывов.
+        """
+        queryset = self.filter_queryset(
+            self.get_queryset().filter(condition)
+        ).order_by(*ordering)
+        if settings.API_FAST_LISTS:
+            return self.fast_list(queryset)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ReviewViewSet(
+    ReplicaReadMixin, StreamingListMixin, CachedResponseMixin,
+    ReviewFastListMixin, viewsets.ModelViewSet
+):
     """Вьюсет для запросов к объектам Review."""
 
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthorModeratorAdminOrReadOnly,
     )
+    pagination_class = ReviewCommentPagination
+
+    def get_cache_families(self):
+        # Отзывы содержат имя автора: переименование сбрасывает их.
+        # Семейство произведения сбрасывает отзывы вместе с ним, в том
+        # числе при удалении в фоне (remove_title).
+        title = f'title:{self.kwargs.get("title_id")}'
+        if self.action == 'list':
+            return (f'reviews:{self.kwargs.get("title_id")}', title, 'users')
+        return (f'review:{self.kwargs.get("pk")}', title, 'users')
 
     def get_title(self):
         """Определение объекта Title, связанного с Review."""
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('pk'), pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
         """Определение множества объектов Review."""
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
+
+    def perform_destroy(self, instance):
+        delete_review(instance)
 
     def perform_create(self, serializer):
-        """Переопределение метода создания объекта Review."""
-        serializer.save(
-            author=self.request.user,
-            title=self.get_title()
-        )
+        """
+        Переопределение метода создания объекта Review. Повторный отзыв
+        отсекает ограничение unique_author_for_a_title в БД, без
+        отдельной проверки перед вставкой. Отзыв ищется только после
+        ошибки: иначе её вызвало другое ограничение, и она не скрывается.
+        """
+        author, title = as_model(self.request.user), self.get_title()
+        try:
+            serializer.save(author=author, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(author=author, title=title).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [ONE_REVIEW_MESSAGE]}
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin, StreamingListMixin, CachedResponseMixin,
+    CommentFastListMixin, viewsets.ModelViewSet
+):
     """Вьюсет для запросов к объектам Comment."""
 
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthorModeratorAdminOrReadOnly,
     )
+    pagination_class = ReviewCommentPagination
 
-    def get_review(self):
-        """Определение объекта Review, связанного с Comment."""
+    def get_cache_families(self):
+        title = f'title:{self.kwargs.get("title_id")}'
+        if self.action == 'list':
+            return (
+                f'comments:{self.kwargs.get("review_id")}', title, 'users'
+            )
+        return (f'comment:{self.kwargs.get("pk")}', title, 'users')
 
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id')
-        )
+    def get_review(self):
+        """Определение объекта Review произведения, связанного с Comment."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('pk', 'title_id'),
+                pk=self.kwargs.get('review_id'),
+                title=self.kwargs.get('title_id'),
+                title__deleted=None
+            )
+        return self._review
 
     def get_queryset(self):
         """Определение множества объектов Comment."""
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
         """Переопределение метода создания объекта Comment."""
         serializer.save(
-            author=self.request.user,
+            author=as_model(self.request.user),
             review=self.get_review()
         )
@@ -0,0 +1,49 @@
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db.backends.postgresql import base
+
+from .pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(wrapper):
+    with _pools_lock:
+        if wrapper.alias not in _pools:
+            options = wrapper.settings_dict.get('POOL', {})
+            _pools[wrapper.alias] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 5),
+                recycle=options.get('RECYCLE', 1800),
+                health_checks=settings.DB_HEALTH_CHECKS,
+            )
+        return _pools[wrapper.alias]
+
+
+def get_pool_stats():
+    """Занятость пулов соединений этого процесса по псевдонимам БД."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.get_stats() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL с пулом соединений процесса: закрытие соединения
+    в конце запроса возвращает его в пул, следующий запрос любого
+    потока берёт готовое соединение без нового подключения.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = get_pool(self).acquire(
+            partial(super().get_new_connection, conn_params)
+        )
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            _pools[self.alias].release(self.connection)
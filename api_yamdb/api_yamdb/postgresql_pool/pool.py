@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+POOL_TIMEOUT_MESSAGE = 'Connection pool exhausted: waited {:.1f}s'
+
+
+class ConnectionPool:
+    """
+    Пул соединений процесса. Потоки берут соединение при первом запросе
+    к БД и возвращают его вместо закрытия; число соединений ограничено,
+    при исчерпании поток ждёт не дольше timeout. Соединения старше
+    recycle секунд закрываются при возврате.
+    """
+
+    def __init__(self, max_size, timeout, recycle, health_checks):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.health_checks = health_checks
+        self.condition = threading.Condition()
+        self.idle = deque()
+        self.created = {}
+        self.size = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.opened = 0
+        self.closed = 0
+
+    def acquire(self, connect):
+        started = time.monotonic()
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise OperationalError(
+                        POOL_TIMEOUT_MESSAGE.format(self.timeout)
+                    )
+                self.condition.wait(remaining)
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.waits += 1
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+            if self.idle:
+                connection = self.idle.pop()
+            else:
+                connection = None
+                self.size += 1
+        if connection is not None and self.is_usable(connection):
+            return connection
+        if connection is not None:
+            self.discard(connection, reserve=True)
+        return self.open(connect)
+
+    def open(self, connect):
+        """Новое соединение на уже зарезервированное в пуле место."""
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.created[id(connection)] = time.monotonic()
+            self.opened += 1
+        return connection
+
+    def release(self, connection):
+        if connection.closed or not self.reset(connection) or (
+            time.monotonic() - self.created.get(id(connection), 0)
+            > self.recycle
+        ):
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self, connection, reserve=False):
+        """Закрытие соединения; с reserve место в пуле остаётся занятым."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.created.pop(id(connection), None)
+            self.closed += 1
+            if not reserve:
+                self.size -= 1
+                self.condition.notify()
+
+    def reset(self, connection):
+        """Откат незавершённой транзакции перед возвратом в пул."""
+        try:
+            if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception:
+            return False
+        return connection.get_transaction_status() == TRANSACTION_STATUS_IDLE
+
+    def is_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                'max_size': self.max_size,
+                'size': self.size,
+                'in_use': self.size - len(self.idle),
+                'idle': len(self.idle),
+                'waits': self.waits,
+                'wait_time_ms': round(self.wait_time * 1000, 1),
+                'max_wait_ms': round(self.max_wait * 1000, 1),
+                'timeouts': self.timeouts,
+                'opened': self.opened,
+                'closed': self.closed,
+            }
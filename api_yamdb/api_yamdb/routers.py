@@ -0,0 +1,36 @@
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = 'replica'
+
+_state = threading.local()
+
+
+def read_from_replica(enabled):
+    """Направление чтений текущего потока (запроса) на реплику."""
+    _state.replica = enabled
+
+
+def is_replica_read():
+    return getattr(_state, 'replica', False) and REPLICA in settings.DATABASES
+
+
+class ReplicaRouter:
+    """
+    Чтения безопасных запросов к отмеченным представлениям идут
+    на реплику, всё остальное — на основную БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if is_replica_read() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
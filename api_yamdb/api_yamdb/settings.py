@@ -17,12 +17,14 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
-    'reviews',
+    'reviews.apps.ReviewsConfig',
     'users.apps.UsersConfig',
-    'api',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.InstrumentationMiddleware',
+    'api.middleware.RepeatedQueriesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,7 +63,36 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=0)),
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'RECYCLE': int(os.getenv('DB_POOL_RECYCLE', default=1800)),
+        },
+    }
+}
+
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ('api_yamdb.routers.ReplicaRouter',)
+
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', default='') == 'true'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
@@ -108,10 +139,21 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.AllowAny',),
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_AUTHENTICATION_CLASSES': ('users.authentication.ClaimsJWTAuthentication',),
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': ('api.throttling.WriteThrottle',),
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': os.getenv('THROTTLE_SIGNUP_RATE', default='10/hour'),
+        'token': os.getenv('THROTTLE_TOKEN_RATE', default='10/min'),
+        'write': os.getenv('THROTTLE_WRITE_RATE', default='120/min'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
 }
 
 SIMPLE_JWT = {
@@ -129,3 +171,37 @@ MAX_LIMIT_TITLE = 200
 MIN_SCORE_VALUE = 1
 MAX_SCORE_VALUE = 10
 FROM_EMAIL = 'yamdb@mail.com'
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_DELAY = 60
+SEARCH_CONFIG = 'russian'
+TRENDING_WINDOW = timedelta(
+    days=int(os.getenv('TRENDING_WINDOW_DAYS', default=7))
+)
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+BULK_MAX_ITEMS = 1000
+AUTH_CLAIMS_TIMEOUT = int(os.getenv('AUTH_CLAIMS_TIMEOUT', default=60))
+THROTTLE_BACKEND = os.getenv('THROTTLE_BACKEND', default='local')
+THROTTLE_CACHE_ALIAS = 'default'
+THROTTLE_MAX_BUCKETS = 100000
+REPLICA_STICKY_SECONDS = int(
+    os.getenv('REPLICA_STICKY_SECONDS', default=5)
+)
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', default=0))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+RATING_PRIOR_MEAN = float(os.getenv('RATING_PRIOR_MEAN', default=5.5))
+RATING_PRIOR_WEIGHT = int(os.getenv('RATING_PRIOR_WEIGHT', default=10))
+TITLE_WEIGHTED_RATING = (
+    os.getenv('TITLE_WEIGHTED_RATING', default='') == 'true'
+)
+STATS_MAX_IDS = 100
+STREAM_CHUNK_SIZE = 1000
+REFERENCE_CACHE_SIZE = 10000
+REFERENCE_CACHE_TIMEOUT = int(
+    os.getenv('REFERENCE_CACHE_TIMEOUT', default=60)
+)
+DELETE_BATCH_SIZE = 1000
+BACKGROUND_DELETE = os.getenv('BACKGROUND_DELETE', default='') == 'true'
+API_FAST_LISTS = os.getenv('API_FAST_LISTS', default='') == 'true'
+QUERY_CHECK = os.getenv('QUERY_CHECK', default='') == 'true'
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', default=3))
@@ -0,0 +1,30 @@
+import multiprocessing
+import os
+
+# Потоковые воркеры: пока один поток ждёт ответа PostgreSQL, другие
+# потоки того же процесса обслуживают запросы. Медленных клиентов
+# буферизует nginx, поэтому воркеры не ждут сети.
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', default=multiprocessing.cpu_count() * 2 + 1
+))
+threads = int(os.getenv('GUNICORN_THREADS', default=4))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+
+
+def on_starting(server):
+    """Метрики прошлого запуска в общем каталоге не нужны."""
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
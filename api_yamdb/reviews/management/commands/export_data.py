@@ -0,0 +1,219 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+EXPORT_DIR = os.path.join(settings.BASE_DIR, 'export')
+FORMATS = ('csv', 'jsonl')
+
+# Имена файлов и колонки совпадают с файлами в api/static/data/.
+# Произведения выгружаются вместе с помеченными на удаление: их жанры,
+# отзывы и комментарии остаются в БД до purge_deleted и попадают в выгрузку.
+TABLES = {
+    'users': (User.objects, (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    )),
+    'category': (Category.objects, ('id', 'name', 'slug')),
+    'genre': (Genre.objects, ('id', 'name', 'slug')),
+    'titles': (Title.all_objects, ('id', 'name', 'year', 'category')),
+    'genre_title': (
+        Title.genre.through.objects, ('id', 'title_id', 'genre_id')
+    ),
+    'review': (Review.objects, (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    )),
+    'comments': (Comment.objects, (
+        'id', 'review_id', 'text', 'author', 'pub_date'
+    )),
+}
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class TableExport:
+    """
+    Выгрузка одной таблицы порциями по возрастанию id. После каждой
+    порции файл дописывается и фиксируется контрольная точка: последний
+    выгруженный id и размер файла. При возобновлении файл обрезается до
+    размера из контрольной точки, а выгрузка продолжается со следующего id.
+    """
+
+    def __init__(self, table, options):
+        self.table = table
+        self.manager, self.columns = TABLES[table]
+        self.format = options['format']
+        self.gzip = options['gzip']
+        self.chunk_size = options['chunk_size']
+        filename = f'{table}.{self.format}' + ('.gz' if self.gzip else '')
+        self.path = os.path.join(options['output'], filename)
+        self.checkpoint_path = f'{self.path}.checkpoint'
+
+    def read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def write_checkpoint(self, checkpoint):
+        temporary_path = f'{self.checkpoint_path}.tmp'
+        with open(temporary_path, 'w', encoding='utf8') as file:
+            json.dump(checkpoint, file)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def render(self, rows, header):
+        buffer = io.StringIO()
+        if self.format == 'csv':
+            writer = csv.writer(buffer)
+            if header:
+                writer.writerow(self.columns)
+            for row in rows:
+                writer.writerow([format_value(value) for value in row])
+        else:
+            for row in rows:
+                buffer.write(json.dumps(
+                    dict(zip(self.columns, map(format_value, row))),
+                    ensure_ascii=False
+                ))
+                buffer.write('\n')
+        return buffer.getvalue().encode('utf8')
+
+    def write(self, data, checkpoint):
+        """Дозапись данных отдельным gzip-блоком и сдвиг размера файла."""
+        with open(self.path, 'ab') as file:
+            if self.gzip:
+                with gzip.GzipFile(fileobj=file, mode='wb') as archive:
+                    archive.write(data)
+            else:
+                file.write(data)
+            checkpoint['size'] = file.tell()
+
+    def append(self, rows, checkpoint):
+        data = self.render(rows, header=checkpoint['size'] == 0)
+        self.write(data, checkpoint)
+        checkpoint['last_id'] = rows[-1][0]
+        checkpoint['rows'] += len(rows)
+        self.write_checkpoint(checkpoint)
+
+    def run(self, resume):
+        started = time.monotonic()
+        checkpoint = self.read_checkpoint() if resume else None
+        if checkpoint is None:
+            checkpoint = {'last_id': 0, 'size': 0, 'rows': 0, 'done': False}
+        if checkpoint['done']:
+            return self.table, checkpoint['rows'], 0, 0.0
+        with open(self.path, 'ab') as file:
+            file.truncate(checkpoint['size'])
+        exported = 0
+        queryset = (
+            self.manager.filter(pk__gt=checkpoint['last_id'])
+            .order_by('pk')
+            .values_list(*self.columns)
+        )
+        rows = []
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            rows.append(row)
+            if len(rows) >= self.chunk_size:
+                self.append(rows, checkpoint)
+                exported += len(rows)
+                rows = []
+        if rows:
+            self.append(rows, checkpoint)
+            exported += len(rows)
+        elif checkpoint['size'] == 0:
+            self.write(self.render([], header=True), checkpoint)
+        checkpoint['done'] = True
+        self.write_checkpoint(checkpoint)
+        return (
+            self.table, checkpoint['rows'], exported,
+            time.monotonic() - started
+        )
+
+
+def init_worker():
+    """Каждый процесс открывает собственные соединения с БД."""
+    django.setup()
+    connections.close_all()
+
+
+def export_table(table, options, resume):
+    return TableExport(table, options).run(resume)
+
+
+class Command(BaseCommand):
+    """Выгрузка данных всех моделей в файлы формата api/static/data/."""
+
+    help = 'Exports all tables to CSV or JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=EXPORT_DIR,
+            help='Directory for the exported files.'
+        )
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument(
+            '--gzip', action='store_true', help='Compress files with gzip.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of tables exported in parallel.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Rows fetched per server-side cursor round trip '
+                 'and written per checkpoint.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue an interrupted export from its checkpoints.'
+        )
+        parser.add_argument(
+            'tables', nargs='*', metavar='table',
+            help=f'Tables to export: {", ".join(TABLES)}. Default: all.'
+        )
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or list(TABLES)
+        unknown = set(tables) - set(TABLES)
+        if unknown:
+            raise CommandError(f'Unknown tables: {", ".join(unknown)}')
+        os.makedirs(options['output'], exist_ok=True)
+        worker_options = {
+            key: options[key]
+            for key in ('output', 'format', 'gzip', 'chunk_size')
+        }
+        # Соединения родительского процесса не должны наследоваться.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(options['workers'], len(tables))),
+            initializer=init_worker
+        ) as executor:
+            futures = [
+                executor.submit(
+                    export_table, table, worker_options, options['resume']
+                )
+                for table in tables
+            ]
+            for future in as_completed(futures):
+                table, total, exported, elapsed = future.result()
+                rate = exported / elapsed if elapsed else 0
+                self.stdout.write(
+                    f'{table}: {total} rows, {exported} exported now, '
+                    f'{rate:.0f} rows/s'
+                )
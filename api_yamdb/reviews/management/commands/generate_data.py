@@ -0,0 +1,210 @@
+import random
+import time
+from datetime import timedelta
+
+from api.cache import invalidate_all
+from django.core.management import BaseCommand, CommandError, call_command
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+from .load_data import (ALREDY_LOADED_ERROR_MESSAGE, GenreTitle, keep_pub_date,
+                        reset_sequences)
+
+WORDS = (
+    'война', 'мир', 'любовь', 'время', 'дом', 'город', 'ночь', 'море',
+    'звезда', 'дорога', 'тайна', 'зима', 'сад', 'огонь', 'песня', 'сон',
+    'остров', 'небо', 'память', 'свет', 'тень', 'ветер', 'берег', 'путь',
+)
+
+
+def get_review_counts(titles, reviews, exponent, limit):
+    """
+    Число отзывов на произведение по закону Ципфа: произведение ранга r
+    получает долю, пропорциональную 1 / r ** exponent. Отзывов на одно
+    произведение не больше limit — по одному от каждого пользователя.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, titles + 1)]
+    total = sum(weights)
+    return [min(limit, round(reviews * weight / total)) for weight in weights]
+
+
+class Command(BaseCommand):
+    """
+    Генерация синтетических данных заданного объёма для нагрузочных
+    тестов. При одинаковом --seed получается одинаковый набор данных.
+    Строки вставляются пачками, в памяти держится только текущая пачка.
+    """
+
+    help = 'Generates a reproducible synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument(
+            '--comments', type=float, default=0.5,
+            help='Average number of comments per review.'
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Exponent of the Zipf distribution of reviews per title.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Reviews are spread over this many recent days.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of rows inserted per query.'
+        )
+
+    def handle(self, *args, **options):
+        if Title.objects.exists() or User.objects.exists():
+            return ALREDY_LOADED_ERROR_MESSAGE
+        for name in ('titles', 'users', 'genres', 'categories'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be positive')
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        with keep_pub_date():
+            self.insert(Category, self.build_categories(
+                Category, options['categories']
+            ))
+            self.insert(Genre, self.build_categories(
+                Genre, options['genres']
+            ))
+            self.insert(User, self.build_users())
+            self.insert(Title, self.build_titles())
+            self.insert(GenreTitle, self.build_genre_titles())
+            self.insert_reviews()
+            self.stdout.write(
+                f'{Comment._meta.db_table}: {self.comment_id} rows'
+            )
+        reset_sequences([Category, Genre, User, Title, GenreTitle, Review,
+                         Comment])
+        call_command('recalculate_ratings', stdout=self.stdout)
+        call_command('refresh_leaderboard', stdout=self.stdout)
+        invalidate_all()
+        return None
+
+    def insert(self, model, rows, flushed=None):
+        """Вставка пачками; flushed вызывается после каждой пачки."""
+        started = time.monotonic()
+        batch = []
+        inserted = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.options['batch_size']:
+                model.objects.bulk_create(batch)
+                inserted += len(batch)
+                batch = []
+                if flushed is not None:
+                    flushed()
+        if batch:
+            model.objects.bulk_create(batch)
+            inserted += len(batch)
+        if flushed is not None:
+            flushed()
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{model._meta.db_table}: {inserted} rows, '
+            f'{inserted / elapsed:.0f} rows/s'
+        )
+
+    def build_categories(self, model, count):
+        name = model._meta.model_name
+        for pk in range(1, count + 1):
+            yield model(id=pk, name=f'{name} {pk}', slug=f'{name}-{pk}')
+
+    def build_users(self):
+        for pk in range(1, self.options['users'] + 1):
+            yield User(
+                id=pk, username=f'user{pk}', email=f'user{pk}@example.com'
+            )
+
+    def build_titles(self):
+        for pk in range(1, self.options['titles'] + 1):
+            words = self.random.sample(WORDS, 3)
+            yield Title(
+                id=pk,
+                name=' '.join(words[:2]).capitalize(),
+                year=self.random.randint(1900, self.now.year),
+                description=f'{" ".join(words)} {pk}',
+                category_id=self.random.randint(
+                    1, self.options['categories']
+                )
+            )
+
+    def build_genre_titles(self):
+        genres = range(1, self.options['genres'] + 1)
+        for title_id in range(1, self.options['titles'] + 1):
+            count = min(len(genres), self.random.randint(1, 3))
+            for genre_id in self.random.sample(genres, count):
+                yield GenreTitle(title_id=title_id, genre_id=genre_id)
+
+    def insert_reviews(self):
+        """
+        Отзывы и комментарии к ним создаются одним проходом: комментарии
+        копятся, пока не вставлена пачка отзывов, к которым они относятся.
+        """
+        comments = []
+        self.comment_id = 0
+
+        def insert_comments():
+            Comment.objects.bulk_create(comments)
+            comments.clear()
+
+        self.insert(Review, self.build_reviews(comments), insert_comments)
+
+    def build_reviews(self, comments):
+        options = self.options
+        counts = get_review_counts(
+            options['titles'], options['reviews'], options['zipf'],
+            options['users']
+        )
+        # Ранги произведений перемешаны, чтобы популярность
+        # не совпадала с порядком id.
+        title_ids = list(range(1, options['titles'] + 1))
+        self.random.shuffle(title_ids)
+        review_id = 0
+        for title_id, count in zip(title_ids, counts):
+            quality = self.random.uniform(3, 9)
+            first_author = self.random.randrange(options['users'])
+            for offset in range(count):
+                review_id += 1
+                review = Review(
+                    id=review_id,
+                    title_id=title_id,
+                    author_id=(first_author + offset) % options['users'] + 1,
+                    text=' '.join(self.random.sample(WORDS, 5)),
+                    score=min(10, max(1, round(
+                        self.random.gauss(quality, 1.5)
+                    ))),
+                    pub_date=self.now - timedelta(
+                        seconds=self.random.uniform(
+                            0, options['days'] * 86400
+                        )
+                    )
+                )
+                comments.extend(self.build_comments(review))
+                yield review
+
+    def build_comments(self, review):
+        average = self.options['comments']
+        count = int(average) + (self.random.random() < average % 1)
+        for number in range(1, count + 1):
+            self.comment_id += 1
+            yield Comment(
+                id=self.comment_id,
+                review_id=review.id,
+                author_id=self.random.randint(1, self.options['users']),
+                text=' '.join(self.random.sample(WORDS, 4)),
+                pub_date=min(
+                    self.now, review.pub_date + timedelta(hours=number)
+                )
+            )
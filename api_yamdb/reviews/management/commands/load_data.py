@@ -1,4 +1,13 @@
-from django.core.management import BaseCommand
+import csv
+import os
+import time
+from contextlib import contextmanager
+
+from api.cache import invalidate_all
+from django.conf import settings
+from django.core.management import BaseCommand, call_command
+from django.core.management.color import no_style
+from django.db import connection, transaction
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
@@ -8,11 +17,66 @@ first delete the db.sqlite3 file to destroy the database.
 Then, run `python manage.py migrate` for a new empty
 database with tables"""
 
+DATA_DIR = os.path.join(settings.BASE_DIR, 'api', 'static', 'data')
+GenreTitle = Title.genre.through
+
+
+class IdSet:
+    """Множество id в виде битовой карты: 1 бит на id вместо объекта int."""
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, value):
+        index, bit = divmod(value, 8)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index - len(self.bits) + 1))
+        self.bits[index] |= 1 << bit
+
+    def __contains__(self, value):
+        index, bit = divmod(value, 8)
+        return index < len(self.bits) and bool(self.bits[index] & 1 << bit)
+
+
+def parse_id(value):
+    return int(value) if value else None
+
+
+def reset_sequences(models):
+    """Сдвиг счётчиков id после вставки строк с явными id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+@contextmanager
+def keep_pub_date():
+    """Сохранение дат публикации из файлов вместо текущего времени."""
+    fields = [model._meta.get_field('pub_date') for model in (Review, Comment)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
 
 class Command(BaseCommand):
     """Загрузка данных в модели."""
 
-    help = "Loads data from static/data/titles.csv"
+    help = 'Loads data from api/static/data/*.csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DATA_DIR,
+            help='Directory with the CSV files.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of rows inserted per query.'
+        )
 
     def handle(self, *args, **options):
         if (
@@ -25,97 +89,114 @@ class Command(BaseCommand):
         ):
             return (ALREDY_LOADED_ERROR_MESSAGE)
 
-        print("Loading categories data")
-        with open('static/data/category.csv', encoding='utf8') as input_file:
-            input_file_without_header = input_file.read().splitlines[1:]
-            for row in input_file_without_header:
-                category = Category(*row.split(','))
-                category.save()
-
-        print("Loading genres data")
-        with open('static/data/genre.csv', encoding='utf8') as input_file:
-            input_file_without_header = input_file.read().splitlines[1:]
-            for row in input_file_without_header:
-                genre = Genre(*row.split(','))
-                genre.save()
-
-        print("Loading users data")
-        with open('static/data/users.csv', encoding='utf8') as input_file:
-            input_file_without_header = input_file.read().splitlines[1:]
-            for row in input_file_without_header:
-                (
-                    id,
-                    username,
-                    email,
-                    role,
-                    bio,
-                    first_name,
-                    last_name
-                ) = row.split(',')
-                user = User(
-                    id=id,
-                    username=username,
-                    email=email,
-                    role=role,
-                    bio=bio,
-                    first_name=first_name,
-                    last_name=last_name
-                )
-                user.save()
-
-        print("Loading titles data")
-        with open('static/data/titles.csv', encoding='utf8') as input_file:
-            input_file_without_header = input_file.read().splitlines[1:]
-            for row in input_file_without_header:
-                id, name, year, id_category = row.split(',')
-                category = Category.objects.get(pk=id_category)
-                title = Title(
-                    id=id,
-                    name=name,
-                    year=year,
-                    category=category
-                )
-                title.save()
-
-        print("Loading reviews data")
-        with open('static/data/review.csv', encoding='utf8') as input_file:
-            input_file_without_header = input_file.read().splitlines[1:5]
-            for row in input_file_without_header:
-                if '"' in row:
-                    opening_quotation = row.index('"')
-                    closing_quotation = len(row) - row[::-1].index('"')
-                    id, id_title = row[:opening_quotation - 1].split(',')
-                    text = row[opening_quotation + 1: closing_quotation - 1]
-                    (
-                        id_author,
-                        score,
-                        pub_date) = row[closing_quotation + 1:].split(',')
-                    review = Review(
-                        id=id,
-                        title=Title.objects.get(pk=id_title),
-                        text=text,
-                        author=User.objects.get(pk=id_author),
-                        score=score,
-                        pub_date=pub_date)
-                    review.save()
-
-        print("Loading comments data")
-        with open('static/data/comments.csv', encoding='utf8') as input_file:
-            input_file_without_header = input_file.read().splitlines[1:5]
-            for row in input_file_without_header:
-                if '"' in row:
-                    opening_quotation = row.index('"')
-                    closing_quotation = len(row) - row[::-1].index('"')
-                    id, id_review = row[:opening_quotation - 1].split(',')
-                    text = row[opening_quotation + 1: closing_quotation - 1]
-                    (
-                        id_author,
-                        pub_date) = row[closing_quotation + 1:].split(',')
-                    comment = Comment(
-                        id=id,
-                        review=Review.objects.get(pk=id_review),
-                        text=text,
-                        author=User.objects.get(pk=id_author),
-                        pub_date=pub_date
-                    )
-                    comment.save()
+        self.path = options['path']
+        self.batch_size = options['batch_size']
+        self.ids = {
+            model: IdSet()
+            for model in (Category, Genre, User, Title, Review)
+        }
+        tables = (
+            ('category.csv', Category, self.build_category_genre),
+            ('genre.csv', Genre, self.build_category_genre),
+            ('users.csv', User, self.build_user),
+            ('titles.csv', Title, self.build_title),
+            ('genre_title.csv', GenreTitle, self.build_genre_title),
+            ('review.csv', Review, self.build_review),
+            ('comments.csv', Comment, self.build_comment),
+        )
+        with transaction.atomic(), keep_pub_date():
+            for filename, model, build in tables:
+                self.load(filename, model, build)
+            reset_sequences([model for _, model, _ in tables])
+            call_command('recalculate_ratings', stdout=self.stdout)
+            call_command('refresh_leaderboard', stdout=self.stdout)
+            invalidate_all()
+        return None
+
+    def load(self, filename, model, build):
+        """Потоковое чтение файла и вставка строк пачками."""
+        started = time.monotonic()
+        loaded = skipped = 0
+        batch = []
+        with open(
+            os.path.join(self.path, filename), encoding='utf8', newline=''
+        ) as input_file:
+            for row in csv.DictReader(input_file):
+                instance = build(model, row)
+                if instance is None:
+                    skipped += 1
+                    continue
+                if model in self.ids:
+                    self.ids[model].add(instance.pk)
+                batch.append(instance)
+                if len(batch) >= self.batch_size:
+                    model.objects.bulk_create(batch)
+                    loaded += len(batch)
+                    batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            loaded += len(batch)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{filename}: {loaded} rows loaded, {skipped} skipped, '
+            f'{loaded / elapsed:.0f} rows/s'
+        )
+
+    def build_category_genre(self, model, row):
+        return model(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_user(self, model, row):
+        return model(
+            id=int(row['id']),
+            username=row['username'],
+            email=row['email'],
+            role=row['role'],
+            bio=row['bio'],
+            first_name=row['first_name'],
+            last_name=row['last_name']
+        )
+
+    def build_title(self, model, row):
+        category_id = parse_id(row['category'])
+        if category_id is not None and category_id not in self.ids[Category]:
+            return None
+        return model(
+            id=int(row['id']),
+            name=row['name'],
+            year=int(row['year']),
+            category_id=category_id
+        )
+
+    def build_genre_title(self, model, row):
+        title_id, genre_id = int(row['title_id']), int(row['genre_id'])
+        if title_id not in self.ids[Title] or genre_id not in self.ids[Genre]:
+            return None
+        return model(id=int(row['id']), title_id=title_id, genre_id=genre_id)
+
+    def build_review(self, model, row):
+        title_id, author_id = int(row['title_id']), int(row['author'])
+        if title_id not in self.ids[Title] or author_id not in self.ids[User]:
+            return None
+        return model(
+            id=int(row['id']),
+            title_id=title_id,
+            text=row['text'],
+            author_id=author_id,
+            score=int(row['score']),
+            pub_date=row['pub_date']
+        )
+
+    def build_comment(self, model, row):
+        review_id, author_id = int(row['review_id']), int(row['author'])
+        if (
+            review_id not in self.ids[Review]
+            or author_id not in self.ids[User]
+        ):
+            return None
+        return model(
+            id=int(row['id']),
+            review_id=review_id,
+            text=row['text'],
+            author_id=author_id,
+            pub_date=row['pub_date']
+        )
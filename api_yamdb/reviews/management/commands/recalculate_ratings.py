@@ -0,0 +1,105 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import (Avg, Count, IntegerField, OuterRef, Q, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce
+from reviews.models import SCORES, Review, Title, score_field
+
+
+def review_subquery(aggregate, **filters):
+    """Коррелированный подзапрос агрегата по отзывам произведения."""
+    return Subquery(
+        Review.objects.filter(title=OuterRef('pk'), **filters)
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def count_subquery(**filters):
+    return Coalesce(
+        review_subquery(Count('pk'), **filters), 0,
+        output_field=IntegerField()
+    )
+
+
+def is_stale(title):
+    count, score_sum = title.actual_count, title.actual_sum
+    rating = score_sum / count if count else None
+    return (
+        title.review_count != count
+        or title.score_sum != score_sum
+        or (title.rating is None) != (rating is None)
+        or (rating is not None and abs(title.rating - rating) > 1e-9)
+        or any(
+            getattr(title, field) != getattr(title, f'actual_{field}')
+            for field in Title.HISTOGRAM_FIELDS
+        )
+    )
+
+
+class Command(BaseCommand):
+    """Пересчёт и проверка денормализованных рейтингов произведений."""
+
+    help = ('Recalculates rating, review_count, score_sum and the score '
+            'histogram of titles')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report titles with stale counters and fail if any.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of titles fetched per database round trip.'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.annotate(
+            actual_count=Count('reviews'),
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            **{
+                f'actual_{score_field(score)}': Count(
+                    'reviews', filter=Q(reviews__score=score)
+                )
+                for score in SCORES
+            }
+        ).only('pk', *Title.RATING_FIELDS).order_by('pk')
+
+        stale = [
+            title.pk
+            for title in titles.iterator(chunk_size=options['chunk_size'])
+            if is_stale(title)
+        ]
+
+        if options['check']:
+            if stale:
+                raise CommandError(
+                    f'{len(stale)} titles have stale ratings: '
+                    f'{", ".join(map(str, stale[:20]))}'
+                )
+            self.stdout.write(self.style.SUCCESS('All ratings are up to date'))
+            return
+
+        # Пересчёт выполняется одним UPDATE с подзапросами,
+        # поэтому параллельные изменения отзывов не теряются.
+        with transaction.atomic():
+            for start in range(0, len(stale), options['chunk_size']):
+                Title.objects.filter(
+                    pk__in=stale[start:start + options['chunk_size']]
+                ).update(
+                    review_count=count_subquery(),
+                    score_sum=Coalesce(
+                        review_subquery(Sum('score')), 0,
+                        output_field=IntegerField()
+                    ),
+                    rating=review_subquery(Avg('score')),
+                    **{
+                        score_field(score): count_subquery(score=score)
+                        for score in SCORES
+                    }
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Recalculated ratings of {len(stale)} titles')
+        )
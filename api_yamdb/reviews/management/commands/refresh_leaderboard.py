@@ -0,0 +1,58 @@
+from api.cache import invalidate
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from reviews.models import Review, Title
+from reviews.signals import get_trending_start
+
+
+class Command(BaseCommand):
+    """
+    Пересчёт счётчиков популярных произведений по скользящему окну.
+    Между запусками счётчики растут при каждом новом отзыве, а команда
+    вычитает отзывы, вышедшие за пределы окна. Запускается периодически.
+    """
+
+    help = 'Refreshes trending counters of titles for the sliding window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Number of titles updated per query.'
+        )
+
+    def handle(self, *args, **options):
+        window_start = get_trending_start()
+        # Пересчитываются только произведения с ненулевым счётчиком
+        # или с отзывами внутри окна, а не весь каталог.
+        title_ids = set(
+            Title.objects.filter(trending_count__gt=0)
+            .values_list('pk', flat=True)
+        )
+        title_ids.update(
+            Review.objects.filter(pub_date__gte=window_start)
+            .order_by().values_list('title_id', flat=True).distinct()
+        )
+        recent_reviews = Subquery(
+            Review.objects.filter(
+                title=OuterRef('pk'), pub_date__gte=window_start
+            )
+            .order_by()
+            .values('title')
+            .annotate(value=Count('pk'))
+            .values('value')
+        )
+        title_ids = sorted(title_ids)
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            for start in range(0, len(title_ids), batch_size):
+                Title.objects.filter(
+                    pk__in=title_ids[start:start + batch_size]
+                ).update(trending_count=Coalesce(
+                    recent_reviews, 0, output_field=IntegerField()
+                ))
+            invalidate('titles')
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed trending counters of {len(title_ids)} titles'
+        ))
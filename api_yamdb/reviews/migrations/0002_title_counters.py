@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:17
+
+from django.db import migrations, models
+from django.db.models import (Avg, Count, IntegerField, OuterRef, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce
+
+
+def review_subquery(Review, aggregate):
+    return Subquery(
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    """Счётчики произведений по уже написанным отзывам."""
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Title.objects.using(schema_editor.connection.alias).update(
+        review_count=Coalesce(
+            review_subquery(Review, Count('pk')), 0,
+            output_field=IntegerField()
+        ),
+        score_sum=Coalesce(
+            review_subquery(Review, Sum('score')), 0,
+            output_field=IntegerField()
+        ),
+        rating=review_subquery(Review, Avg('score')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
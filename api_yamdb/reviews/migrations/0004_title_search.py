@@ -0,0 +1,12 @@
+from django.db import migrations
+
+from reviews.search_index import create_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = create_search_index()
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:17
+
+from django.db import migrations, models
+
+from reviews.search_index import keep_search_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_search'),
+    ]
+
+    operations = keep_search_triggers(
+        migrations.AddField(
+            model_name='title',
+            name='trending_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Отзывов за последние дни'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(rating__isnull=False), fields=['-rating', 'id'], name='title_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(trending_count__gt=0), fields=['-trending_count', 'id'], name='title_trending_idx'),
+        ),
+    )
@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:17
+
+from django.db import migrations, models
+
+from reviews.search_index import keep_search_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ordering'),
+    ]
+
+    operations = keep_search_triggers(
+        migrations.AddField(
+            model_name='title',
+            name='deleted',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Помечено на удаление'),
+        ),
+    )
@@ -1,9 +1,16 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
 from users.models import User
 
-from .validators import validate_year
+from .validators import validate_slug, validate_year
+
+SCORES = range(settings.MIN_SCORE_VALUE, settings.MAX_SCORE_VALUE + 1)
+
+
+def score_field(score):
+    """Имя счётчика оценок score в гистограмме произведения."""
+    return f'score_{score}_count'
 
 
 class CategoryGenre(models.Model):
@@ -13,7 +20,8 @@ class CategoryGenre(models.Model):
     )
     slug = models.SlugField(
         'Идентификатор',
-        max_length=settings.MAX_LIMIT_CATEGORYGENRY_SLUG, unique=True
+        max_length=settings.MAX_LIMIT_CATEGORYGENRY_SLUG, unique=True,
+        validators=(validate_slug,)
     )
 
     class Meta:
@@ -38,6 +46,13 @@ class Genre(CategoryGenre):
         verbose_name_plural = 'Жанры'
 
 
+class TitleManager(models.Manager):
+    """Произведения, кроме помеченных на удаление."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted__isnull=True)
+
+
 class Title(models.Model):
     name = models.TextField(
         'Название',
@@ -58,15 +73,95 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         related_name='titles', null=True, blank=True
     )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    trending_count = models.PositiveIntegerField(
+        'Отзывов за последние дни', default=0, editable=False
+    )
+    deleted = models.DateTimeField(
+        'Помечено на удаление', null=True, blank=True, editable=False
+    )
+    # Гистограмма оценок: по счётчику на каждую оценку, обновляются
+    # вместе с review_count и score_sum тем же UPDATE.
+    score_1_count = models.PositiveIntegerField(
+        'Оценок 1', default=0, editable=False
+    )
+    score_2_count = models.PositiveIntegerField(
+        'Оценок 2', default=0, editable=False
+    )
+    score_3_count = models.PositiveIntegerField(
+        'Оценок 3', default=0, editable=False
+    )
+    score_4_count = models.PositiveIntegerField(
+        'Оценок 4', default=0, editable=False
+    )
+    score_5_count = models.PositiveIntegerField(
+        'Оценок 5', default=0, editable=False
+    )
+    score_6_count = models.PositiveIntegerField(
+        'Оценок 6', default=0, editable=False
+    )
+    score_7_count = models.PositiveIntegerField(
+        'Оценок 7', default=0, editable=False
+    )
+    score_8_count = models.PositiveIntegerField(
+        'Оценок 8', default=0, editable=False
+    )
+    score_9_count = models.PositiveIntegerField(
+        'Оценок 9', default=0, editable=False
+    )
+    score_10_count = models.PositiveIntegerField(
+        'Оценок 10', default=0, editable=False
+    )
+
+    objects = TitleManager()
+    all_objects = models.Manager()
+
+    HISTOGRAM_FIELDS = tuple(score_field(score) for score in SCORES)
+    RATING_FIELDS = ('rating', 'review_count', 'score_sum') + HISTOGRAM_FIELDS
+    COUNTER_FIELDS = RATING_FIELDS + ('trending_count',)
+    SERVICE_FIELDS = COUNTER_FIELDS + ('deleted',)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
-        ordering = ('name',)
+        ordering = ('name', 'id')
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(
+                fields=('-rating', 'id'), name='title_top_idx',
+                condition=models.Q(rating__isnull=False)
+            ),
+            models.Index(
+                fields=('-trending_count', 'id'), name='title_trending_idx',
+                condition=models.Q(trending_count__gt=0)
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Счётчики обновляются только через отзывы, а пометка на удаление —
+        отдельным UPDATE, поэтому при изменении произведения они
+        не перезаписываются.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.SERVICE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class ReviewComment(models.Model):
     """Абстрактная модель для Review и Comment."""
@@ -117,8 +212,57 @@ class Review(ReviewComment):
                 name='unique_author_for_a_title'
             )
         ]
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
         default_related_name = 'reviews'
 
+    def lock_score(self, using):
+        """
+        Сохранённая оценка под блокировкой строки: от неё, а не от
+        загруженной когда-то в объект, считается изменение счётчиков,
+        поэтому параллельные изменения отзыва не вычитают одну оценку
+        дважды. None — отзыва уже нет в БД.
+        """
+        self._stored_score = (
+            Review.objects.using(using).select_for_update()
+            .filter(pk=self.pk).values_list('score', flat=True).first()
+        )
+
+    def save(self, *args, **kwargs):
+        """Сохранение отзыва и счётчиков произведения в одной транзакции."""
+        using = kwargs.get('using') or router.db_for_write(
+            Review, instance=self
+        )
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic(using=using):
+            self._stored_score = None
+            if not self._state.adding and (
+                update_fields is None or 'score' in update_fields
+            ):
+                self.lock_score(using)
+            try:
+                super().save(*args, **kwargs)
+            finally:
+                del self._stored_score
+
+    def delete(self, *args, **kwargs):
+        """Удаление отзыва с вычитанием оценки, сохранённой в БД."""
+        using = kwargs.get('using') or router.db_for_write(
+            Review, instance=self
+        )
+        with transaction.atomic(using=using):
+            self.lock_score(using)
+            try:
+                if self._stored_score is None:
+                    return 0, {}
+                return super().delete(*args, **kwargs)
+            finally:
+                del self._stored_score
+
 
 class Comment(ReviewComment):
     """Описание модели Comment."""
@@ -133,4 +277,10 @@ class Comment(ReviewComment):
     class Meta(ReviewComment.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
         default_related_name = 'comments'
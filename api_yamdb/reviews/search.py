@@ -0,0 +1,65 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .search_index import FTS_TABLE, TABLE
+
+MAX_TERMS = 8
+TERM = re.compile(r'[^\W_]+')
+
+
+def postgresql_search(queryset, terms):
+    # search_vector и индекс по нему создаёт миграция 0004_title_search.
+    query = ' & '.join(f'{term}:*' for term in terms)
+    params = (settings.SEARCH_CONFIG, query)
+    return queryset.annotate(
+        search_rank=RawSQL(
+            f'ts_rank({TABLE}.search_vector, to_tsquery(%s, %s))', params,
+            output_field=FloatField()
+        ),
+        search_match=RawSQL(
+            f'{TABLE}.search_vector @@ to_tsquery(%s, %s)', params,
+            output_field=BooleanField()
+        ),
+    ).filter(search_match=True)
+
+
+def sqlite_search(queryset, terms):
+    # FTS5-таблицу и триггеры создаёт миграция 0004_title_search.
+    query = ' '.join(f'"{term}"*' for term in terms)
+    return queryset.annotate(
+        search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id', (query,),
+            output_field=FloatField()
+        ),
+        search_match=RawSQL(
+            f'{TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)', (query,),
+            output_field=BooleanField()
+        ),
+    ).filter(search_match=True)
+
+
+SEARCH = {
+    'postgresql': postgresql_search,
+    'sqlite': sqlite_search,
+}
+
+
+def search_titles(queryset, text):
+    """
+    Полнотекстовый поиск произведений по названию и описанию:
+    каждое слово запроса ищется как префикс, результаты упорядочены
+    по релевантности, совпадения в названии весят больше.
+    """
+    terms = TERM.findall(text.lower())[:MAX_TERMS]
+    if not terms:
+        return queryset.none()
+    search = SEARCH.get(connections[queryset.db].vendor)
+    if search is None:
+        return queryset.filter(name__icontains=text)
+    return search(queryset, terms).order_by('-search_rank', 'name', 'id')
@@ -0,0 +1,131 @@
+"""
+Поисковый индекс произведений: операции миграций для PostgreSQL
+и SQLite. Модуль не импортирует модели, чтобы миграции не зависели
+от их текущего состояния.
+"""
+from django.conf import settings
+from django.db import migrations
+
+TABLE = 'reviews_title'
+FTS_TABLE = f'{TABLE}_fts'
+
+# PostgreSQL: хранимая генерируемая колонка tsvector с GIN-индексом,
+# СУБД пересчитывает её при любой записи названия или описания.
+POSTGRESQL_SQL = (
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{settings.SEARCH_CONFIG}',
+                              coalesce(name, '')), 'A')
+        || setweight(to_tsvector('{settings.SEARCH_CONFIG}',
+                                 coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX title_search_vector_idx
+    ON {TABLE} USING gin (search_vector)
+    """,
+)
+POSTGRESQL_REVERSE_SQL = (
+    'DROP INDEX title_search_vector_idx',
+    f'ALTER TABLE {TABLE} DROP COLUMN search_vector',
+)
+
+# SQLite: внешняя FTS5-таблица, синхронизируемая триггерами.
+SQLITE_TRIGGERS_SQL = (
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update
+    AFTER UPDATE OF name, description ON {TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+SQLITE_TRIGGERS = tuple(
+    f'{FTS_TABLE}_{event}' for event in ('insert', 'delete', 'update')
+)
+SQLITE_DROP_TRIGGERS_SQL = tuple(
+    f'DROP TRIGGER IF EXISTS {trigger}' for trigger in SQLITE_TRIGGERS
+)
+SQLITE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE}
+    USING fts5(name, description, content='{TABLE}', content_rowid='id')
+    """,
+    *SQLITE_TRIGGERS_SQL,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_REVERSE_SQL = (
+    *SQLITE_DROP_TRIGGERS_SQL,
+    f'DROP TABLE {FTS_TABLE}',
+)
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL, выполняемый только на СУБД vendor."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, (self.vendor, *args), kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+
+def create_search_index():
+    return [
+        VendorRunSQL('postgresql', POSTGRESQL_SQL, POSTGRESQL_REVERSE_SQL),
+        VendorRunSQL('sqlite', SQLITE_SQL, SQLITE_REVERSE_SQL),
+    ]
+
+
+def keep_search_triggers(*operations):
+    """
+    Операции над таблицей Title с сохранением триггеров поиска.
+
+    SQLite выполняет изменение полей пересозданием таблицы и теряет
+    её триггеры: они удаляются до операций и создаются после них,
+    при откате миграции — в обратном порядке. Любая миграция,
+    меняющая поля Title, должна оборачивать операции этой функцией.
+    """
+    return [
+        VendorRunSQL(
+            'sqlite', SQLITE_DROP_TRIGGERS_SQL, SQLITE_TRIGGERS_SQL
+        ),
+        *operations,
+        VendorRunSQL(
+            'sqlite', SQLITE_TRIGGERS_SQL, SQLITE_DROP_TRIGGERS_SQL
+        ),
+    ]
@@ -0,0 +1,82 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import Cast, NullIf
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Review, Title, score_field
+
+
+def get_trending_start():
+    """Начало скользящего окна, по которому считаются популярные."""
+    return timezone.now() - settings.TRENDING_WINDOW
+
+
+def change_title_counters(title_id, scores, trending_delta=0):
+    """
+    Инкрементальное обновление счётчиков произведения одним UPDATE:
+    scores — изменение числа оценок по значениям, например {7: -1, 9: 1}.
+    """
+    scores = {score: delta for score, delta in scores.items() if delta}
+    review_count = F('review_count') + sum(scores.values())
+    score_sum = F('score_sum') + sum(
+        score * delta for score, delta in scores.items()
+    )
+    Title.objects.filter(pk=title_id).update(
+        review_count=review_count,
+        score_sum=score_sum,
+        rating=ExpressionWrapper(
+            Cast(score_sum, FloatField()) / NullIf(review_count, 0),
+            output_field=FloatField()
+        ),
+        trending_count=F('trending_count') + trending_delta,
+        **{
+            score_field(score): F(score_field(score)) + delta
+            for score, delta in scores.items()
+        }
+    )
+
+
+def update_title_counters(title_id, old_score=None, new_score=None,
+                          trending_delta=0):
+    """Оценка old_score убирается, new_score добавляется."""
+    scores = Counter()
+    if old_score is not None:
+        scores[old_score] -= 1
+    if new_score is not None:
+        scores[new_score] += 1
+    change_title_counters(title_id, scores, trending_delta)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Учёт новой оценки или изменения существующей."""
+    if raw:
+        return
+    if created:
+        update_title_counters(
+            instance.title_id, new_score=instance.score, trending_delta=1
+        )
+        return
+    # Оценку, прочитанную под блокировкой, выставляет Review.save.
+    stored_score = getattr(instance, '_stored_score', None)
+    if stored_score is not None and stored_score != instance.score:
+        update_title_counters(
+            instance.title_id, stored_score, instance.score
+        )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Учёт удаления отзыва: при Review.delete вычитается оценка,
+    прочитанная под блокировкой, при каскадном удалении — загруженная.
+    """
+    update_title_counters(
+        instance.title_id,
+        old_score=getattr(instance, '_stored_score', instance.score),
+        trending_delta=-1 if instance.pub_date >= get_trending_start() else 0
+    )
@@ -0,0 +1,49 @@
+from django.conf import settings
+
+from .models import SCORES, Title, score_field
+
+STATS_FIELDS = ('id', 'review_count', 'score_sum') + Title.HISTOGRAM_FIELDS
+
+
+def get_weighted_rating(score_sum, review_count):
+    """
+    Байесовская оценка рейтинга: к отзывам добавляются
+    RATING_PRIOR_WEIGHT воображаемых оценок RATING_PRIOR_MEAN, поэтому
+    произведение с единственной десяткой не обгоняет произведение
+    с сотней девяток.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return round(
+        (settings.RATING_PRIOR_MEAN * weight + score_sum)
+        / (weight + review_count), 2
+    )
+
+
+def get_median(histogram, count):
+    """Медиана по гистограмме: среднее двух средних оценок при чётном."""
+    if not count:
+        return None
+    middle = ((count - 1) // 2, count // 2)
+    values = []
+    seen = 0
+    for score, score_count in histogram.items():
+        values.extend(
+            score for position in middle
+            if seen <= position < seen + score_count
+        )
+        seen += score_count
+    return sum(values) / len(values)
+
+
+def get_stats(row):
+    """Статистика оценок по строке Title.objects.values(*STATS_FIELDS)."""
+    count = row['review_count']
+    histogram = {score: row[score_field(score)] for score in SCORES}
+    return {
+        'id': row['id'],
+        'count': count,
+        'histogram': {str(score): value for score, value in histogram.items()},
+        'mean': round(row['score_sum'] / count, 2) if count else None,
+        'median': get_median(histogram, count),
+        'weighted_rating': get_weighted_rating(row['score_sum'], count),
+    }
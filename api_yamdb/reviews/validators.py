@@ -1,6 +1,10 @@
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+# Адреса `<ресурс>/bulk/` заняты пакетной записью и перекрыли бы
+# жанр или категорию с таким slug.
+RESERVED_SLUGS = ('bulk',)
+
 
 def validate_year(value):
     if value > timezone.now().year:
@@ -8,3 +12,11 @@ def validate_year(value):
             ('Год %(value)s больше текущего!'),
             params={'value': value},
         )
+
+
+def validate_slug(value):
+    if value in RESERVED_SLUGS:
+        raise ValidationError(
+            ('Идентификатор %(value)s зарезервирован.'),
+            params={'value': value},
+        )
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -15,3 +15,17 @@ class UserAdmin(admin.ModelAdmin):
     )
     search_fields = ('username', 'role',)
     list_filter = ('username',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt',
+        'created',
+    )
+    search_fields = ('recipient',)
+    list_filter = ('status',)
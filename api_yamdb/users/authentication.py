@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import USER, User
+
+CLAIMS_KEY = 'users:claims:{}'
+NO_USER_MESSAGE = 'Токен не содержит идентификатора пользователя.'
+INACTIVE_MESSAGE = 'Пользователь не найден или неактивен.'
+STALE_TOKEN_MESSAGE = 'Права пользователя изменились, получите новый токен.'
+
+
+def get_claims(user):
+    """Утверждения токена, по которым проверяются права."""
+    return {
+        'username': user.username,
+        'role': user.role,
+        'is_admin': user.is_admin,
+        'is_moderator': user.is_moderator,
+    }
+
+
+def get_access_token(user):
+    token = AccessToken.for_user(user)
+    for claim, value in get_claims(user).items():
+        token[claim] = value
+    return token
+
+
+def get_current_claims(user_id):
+    """
+    Актуальные утверждения пользователя из кэша с коротким сроком жизни,
+    при промахе — из БД. Пустой словарь: пользователь удалён или неактивен.
+    """
+    key = CLAIMS_KEY.format(user_id)
+    claims = cache.get(key)
+    if claims is None:
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        claims = get_claims(user) if user is not None else {}
+        cache.set(key, claims, settings.AUTH_CLAIMS_TIMEOUT)
+    return claims
+
+
+def forget_claims(user_id):
+    cache.delete(CLAIMS_KEY.format(user_id))
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, построенный по утверждениям токена без запроса к БД."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', USER)
+
+    @cached_property
+    def is_admin(self):
+        return self.token.get('is_admin', False)
+
+    @cached_property
+    def is_moderator(self):
+        return self.token.get('is_moderator', False)
+
+
+def as_model(user):
+    """
+    Пользователь запроса в виде экземпляра User для внешних ключей:
+    заполнены только поля из токена.
+    """
+    if not isinstance(user, ClaimsUser):
+        return user
+    instance = User(id=user.id, username=user.username, role=user.role)
+    instance._state.adding = False
+    return instance
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без чтения пользователя из БД на каждый запрос.
+
+    Утверждения токена сверяются с закэшированными правами пользователя:
+    смена роли или имени, блокировка и удаление отзывают выданные токены
+    сразу при общем кэше и не позже чем через AUTH_CLAIMS_TIMEOUT секунд
+    при кэше в памяти процесса.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(NO_USER_MESSAGE)
+        claims = get_current_claims(user_id)
+        if not claims:
+            raise AuthenticationFailed(INACTIVE_MESSAGE, code='user_inactive')
+        if any(
+            validated_token.get(claim) != value
+            for claim, value in claims.items()
+        ):
+            raise AuthenticationFailed(
+                STALE_TOKEN_MESSAGE, code='token_not_valid'
+            )
+        return ClaimsUser(validated_token)
@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+UPDATED_FIELDS = ('status', 'attempts', 'next_attempt', 'last_error', 'sent')
+
+
+class Command(BaseCommand):
+    """
+    Отправка писем из очереди пачками через одно соединение с почтовым
+    сервером. Неотправленные письма повторяются с экспоненциальной
+    задержкой, после EMAIL_MAX_ATTEMPTS попыток остаются в таблице
+    со статусом failed.
+    """
+
+    help = 'Sends queued emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of emails sent over one connection.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between polls of an empty queue.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        while True:
+            sent, failed = self.send_batch(batch_size)
+            if sent or failed:
+                self.stdout.write(f'{sent} emails sent, {failed} failed')
+            if not options['loop']:
+                break
+            if sent + failed < batch_size:
+                time.sleep(options['interval'])
+
+    def send_batch(self, batch_size):
+        """
+        Выборка и отправка пачки в одной транзакции. На PostgreSQL
+        строки блокируются с SKIP LOCKED, поэтому воркеров может быть
+        несколько.
+        """
+        with transaction.atomic():
+            queryset = OutgoingEmail.objects.filter(
+                status=OutgoingEmail.PENDING,
+                next_attempt__lte=timezone.now()
+            ).order_by('next_attempt', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            emails = list(queryset[:batch_size])
+            if not emails:
+                return 0, 0
+            mail_connection = get_connection()
+            try:
+                mail_connection.open()
+            except Exception as error:
+                for email in emails:
+                    self.fail(email, error)
+            else:
+                for email in emails:
+                    self.send(mail_connection, email)
+                mail_connection.close()
+            OutgoingEmail.objects.bulk_update(emails, UPDATED_FIELDS)
+        sent = sum(email.status == OutgoingEmail.SENT for email in emails)
+        return sent, len(emails) - sent
+
+    def send(self, mail_connection, email):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.message,
+            from_email=email.from_email,
+            to=(email.recipient,),
+            connection=mail_connection
+        )
+        try:
+            message.send()
+        except Exception as error:
+            self.fail(email, error)
+        else:
+            email.status = OutgoingEmail.SENT
+            email.attempts += 1
+            email.sent = timezone.now()
+
+    def fail(self, email, error):
+        email.attempts += 1
+        email.last_error = f'{type(error).__name__}: {error}'
+        if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            email.status = OutgoingEmail.FAILED
+            return
+        delay = settings.EMAIL_RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.next_attempt = timezone.now() + timedelta(seconds=delay)
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils.timezone import now
 
 from .mixins import UsernameValidatorMixin
 
@@ -42,6 +43,18 @@ class User(AbstractUser, UsernameValidatorMixin):
         unique=True,
         blank=True,
         null=True)
+    deleted = models.DateTimeField(
+        verbose_name='Помечен на удаление.',
+        blank=True,
+        null=True,
+        editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Имя при загрузке: по нему видно, что пользователя переименовали.
+        instance.loaded_username = instance.__dict__.get('username')
+        return instance
 
     @property
     def is_admin(self):
@@ -53,3 +66,44 @@ class User(AbstractUser, UsernameValidatorMixin):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Исходящее письмо: отправляется командой send_emails, а не в запросе."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = ((PENDING, 'Ожидает отправки'),
+                (SENT, 'Отправлено'),
+                (FAILED, 'Не отправлено'))
+
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель', max_length=settings.RESTRICT_EMAIL)
+    recipient = models.EmailField(
+        'Получатель', max_length=settings.RESTRICT_EMAIL)
+    status = models.CharField(
+        'Статус',
+        max_length=max([len(key) for key, value in STATUSES]),
+        choices=STATUSES,
+        default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt = models.DateTimeField('Следующая попытка', default=now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Письма'
+        indexes = (
+            models.Index(
+                fields=('next_attempt', 'id'), name='email_pending_idx',
+                condition=models.Q(status='pending')
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_claims
+from .models import User
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Сброс закэшированных прав, чтобы старые токены перепроверились."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_claims(user_id))
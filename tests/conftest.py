@@ -1,9 +1,27 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture
+def checked_client():
+    """API-клиент, валящий тест при повторяющихся запросах к БД."""
+    from tests.utils import QueryCheckingClient
+    return QueryCheckingClient()
+
+
+@pytest.fixture(params=(True, False), ids=('fast', 'serializer'))
+def fast_lists(request, settings):
+    """Оба пути выдачи списков: быстрый и через сериализаторы."""
+    settings.API_FAST_LISTS = request.param
+    return request.param
@@ -0,0 +1,62 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre_{number}')
+        for number in range(1, 4)
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Чудесный фильм', year=2000, category=category
+    )
+    title.genre.set(genres[:2])
+    return title
+
+
+@pytest.fixture
+def catalog(django_user_model, category, genres):
+    """
+    Несколько произведений с разными жанрами, с категорией и без,
+    с отзывами и комментариями разных авторов.
+    """
+    from reviews.models import Comment, Review, Title
+
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(3)
+    ]
+    titles = []
+    for number in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000 + number,
+            category=category if number != 1 else None,
+            description='Описание' if number == 1 else None
+        )
+        title.genre.set(genres[number:])
+        for position, author in enumerate(authors):
+            review = Review.objects.create(
+                title=title, author=author, text=f'Отзыв {position}',
+                score=number + position + 1
+            )
+            for commenter in authors:
+                Comment.objects.create(
+                    review=review, author=commenter,
+                    text=f'Комментарий {commenter.username}'
+                )
+        titles.append(title)
+    return titles
@@ -0,0 +1,9 @@
+from api_yamdb.settings import *  # noqa: F401, F403
+
+# Тесты с БД не требуют PostgreSQL: база SQLite создаётся в памяти.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def user_queries(client, method, url, **kwargs):
+    """Ответ и запросы к таблице пользователей во время запроса."""
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'users_user' in query['sql']
+    ]
+
+
+class TestClaimsAuthentication:
+
+    def test_no_user_query(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        assert user_client.get(url).status_code == 200
+        response, queries = user_queries(user_client, 'get', url)
+        assert response.status_code == 200
+        assert queries == [], (
+            'Проверьте, что аутентифицированный запрос не читает '
+            'пользователя из БД, пока его права закэшированы'
+        )
+
+    def test_writes_without_user_query(self, user, user_client, title):
+        from reviews.models import Comment, Review
+
+        user_client.get('/api/v1/titles/')
+        response, queries = user_queries(
+            user_client, 'post', f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == 201
+        assert queries == [], (
+            'Проверьте, что автор отзыва берётся из токена (as_model), '
+            'а не читается из БД'
+        )
+        review = Review.objects.get(pk=response.json()['id'])
+        assert review.author_id == user.id
+        assert response.json()['author'] == user.username
+
+        response, queries = user_queries(
+            user_client, 'post',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            data={'text': 'Комментарий'}
+        )
+        assert response.status_code == 201
+        assert queries == []
+        comment = Comment.objects.get(pk=response.json()['id'])
+        assert comment.author_id == user.id
+
+    def test_demoted_admin(self, admin, admin_client):
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что после смены роли выданный ранее токен '
+            'администратора отклоняется'
+        )
+        assert response.json()['code'] == 'token_not_valid'
+
+    def test_deleted_user(self, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.delete()
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен удалённого пользователя отклоняется'
+        )
+
+    def test_blocked_user(self, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
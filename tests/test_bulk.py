@@ -0,0 +1,115 @@
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def new_title(name, **fields):
+    return {
+        'name': name, 'year': 2001, 'category': 'films',
+        'genre': ['genre_1'], **fields
+    }
+
+
+def check_repeated(client, url, key, patch, delete):
+    """Пакеты изменения и удаления, где второй элемент повторяет первый."""
+    for method, data in (('patch', patch), ('delete', delete)):
+        response = getattr(client, method)(url, data=data, format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что {method.upper()}-пакет к `{url}` с '
+            f'повторяющимся объектом отклоняется'
+        )
+        results = response.json()['results']
+        assert results[0]['status'] == 'skipped'
+        assert key in results[1]['errors']
+
+
+class TestBulkWrite:
+
+    def test_atomic_rollback(self, admin_client, category, genres):
+        from reviews.models import Title
+
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            new_title('Первое'),
+            new_title('Второе', genre=['нет-такого']),
+            new_title('Третье'),
+        ], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что пакет с ошибочным элементом отклоняется целиком'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            'skipped', 'error', 'skipped'
+        ]
+        assert 'genre' in results[1]['errors']
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в пакете не создаётся ни один объект'
+        )
+
+    def test_atomic_conflict(self, admin_client, genres):
+        from reviews.models import Genre
+
+        response = admin_client.post('/api/v1/genres/bulk/', data=[
+            {'name': 'Новый', 'slug': 'new'},
+            {'name': 'Повтор', 'slug': 'genre_1'},
+        ], format='json')
+        assert response.status_code == 400
+        assert not Genre.objects.filter(slug='new').exists()
+
+    def test_partial(self, admin_client, category, genres):
+        from reviews.models import Title
+
+        url = '/api/v1/titles/bulk/?atomic=false'
+        response = admin_client.post(url, data=[
+            new_title('Первое'),
+            new_title('Второе', year='не год'),
+            new_title('Третье'),
+        ], format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что с `?atomic=false` пакет с ошибками возвращает '
+            'статус 207'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            'created', 'error', 'created'
+        ]
+        assert [result['index'] for result in results] == [0, 1, 2]
+        assert 'year' in results[1]['errors']
+        assert set(Title.objects.values_list('name', flat=True)) == {
+            'Первое', 'Третье'
+        }
+
+        response = admin_client.delete(
+            url, data=[results[0]['id'], 10 ** 6], format='json'
+        )
+        assert response.status_code == 207
+        assert [
+            result['status'] for result in response.json()['results']
+        ] == ['deleted', 'error']
+
+    def test_repeated_titles(self, admin_client, catalog):
+        check_repeated(admin_client, '/api/v1/titles/bulk/', 'id', [
+            {'id': catalog[0].id, 'name': 'Первое'},
+            {'id': catalog[0].id, 'name': 'Второе'},
+        ], [catalog[1].id, catalog[1].id])
+
+    def test_repeated_genres(self, admin_client, genres):
+        check_repeated(admin_client, '/api/v1/genres/bulk/', 'slug', [
+            {'slug': 'genre_1', 'name': 'Первый'},
+            {'slug': 'genre_1', 'name': 'Второй'},
+        ], ['genre_2', 'genre_2'])
+
+    def test_reserved_slug(self, admin_client):
+        from reviews.models import Category, Genre
+
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Пакет', 'slug': 'bulk'}
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что slug `bulk` зарезервирован: адрес '
+            '`/api/v1/genres/bulk/` занят пакетной записью'
+        )
+        response = admin_client.post('/api/v1/categories/bulk/', data=[
+            {'name': 'Пакет', 'slug': 'bulk'},
+        ], format='json')
+        assert response.status_code == 400
+        assert not Genre.objects.exists() and not Category.objects.exists()
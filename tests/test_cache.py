@@ -0,0 +1,159 @@
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def review(user, title):
+    from reviews.models import Review
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=5
+    )
+
+
+@pytest.fixture
+def comment(user, review):
+    from reviews.models import Comment
+    return Comment.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
+
+
+class TestResponseCache:
+
+    def test_rename_author(self, admin_client, another_user_client, title,
+                           review, comment):
+        urls = (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            f'{comment.id}/',
+        )
+        for url in urls:
+            assert 'TestUser' in another_user_client.get(url).content.decode()
+
+        response = admin_client.patch(
+            '/api/v1/users/TestUser/', data={'username': 'Renamed'}
+        )
+        assert response.status_code == 200
+        for url in urls:
+            content = another_user_client.get(url).content.decode()
+            assert 'Renamed' in content and 'TestUser' not in content, (
+                f'Проверьте, что после переименования автора ответ на '
+                f'`{url}` не берётся из кэша со старым именем'
+            )
+
+    def test_delete_title_in_background(self, settings, admin_client,
+                                        another_user_client, title, review,
+                                        comment):
+        settings.BACKGROUND_DELETE = True
+        urls = (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            f'{comment.id}/',
+        )
+        for url in urls:
+            assert another_user_client.get(url).status_code == 200
+
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 204
+        for url in urls:
+            assert another_user_client.get(url).status_code == 404, (
+                f'Проверьте, что после удаления произведения в фоне ответ '
+                f'на `{url}` не берётся из кэша'
+            )
+
+    def test_browsable_api_not_shared(self, user, another_user, user_client,
+                                      another_user_client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        for client, owner in (
+            (user_client, user), (another_user_client, another_user)
+        ):
+            response = client.get(url, HTTP_ACCEPT='text/html')
+            assert response.status_code == 200
+            # Шапка страницы показывает вошедшего пользователя.
+            assert f'TokenUser {owner.id}<' in response.content.decode(), (
+                'Проверьте, что страница BrowsableAPI не берётся из кэша '
+                'ответов другого пользователя'
+            )
+            assert 'ETag' not in response
+        assert 'ETag' in user_client.get(url)
+
+
+class TestConditionalRequests:
+
+    def test_not_modified(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        response = user_client.get(url)
+        assert response.status_code == 200
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что GET-запрос с актуальным If-None-Match '
+            'возвращает статус 304'
+        )
+        assert response['ETag'] == etag
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            'Проверьте, что GET-запрос с актуальным If-Modified-Since '
+            'возвращает статус 304'
+        )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH='"other"')
+        assert response.status_code == 200
+
+    def test_stale_if_match(self, admin_client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        etag = admin_client.get(url)['ETag']
+
+        response = admin_client.patch(
+            url, data={'name': 'Первая правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что изменение с актуальным If-Match выполняется'
+        )
+        response = admin_client.patch(
+            url, data={'name': 'Вторая правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 412, (
+            'Проверьте, что изменение с устаревшим If-Match возвращает '
+            'статус 412'
+        )
+        response = admin_client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+        assert admin_client.get(url).json()['name'] == 'Первая правка'
+
+    def test_title_relations(self, admin_client, user_client, catalog):
+        urls = [f'/api/v1/titles/{title.id}/' for title in catalog]
+
+        def get_etags():
+            return [user_client.get(url)['ETag'] for url in urls]
+
+        etags = get_etags()
+        response = admin_client.patch(
+            '/api/v1/genres/bulk/',
+            data=[{'slug': 'genre_1', 'name': 'Новый жанр'}], format='json'
+        )
+        assert response.status_code == 200
+        changed = get_etags()
+        assert changed[0] != etags[0], (
+            'Проверьте, что переименование жанра меняет ETag произведений '
+            'этого жанра'
+        )
+        assert changed[1:] == etags[1:], (
+            'Проверьте, что переименование жанра не меняет ETag '
+            'произведений других жанров'
+        )
+        assert {'name': 'Новый жанр', 'slug': 'genre_1'} in (
+            user_client.get(urls[0]).json()['genre']
+        )
+
+        response = admin_client.delete('/api/v1/categories/films/')
+        assert response.status_code == 204
+        etags, changed = changed, get_etags()
+        assert changed[1] == etags[1]
+        assert changed[0] != etags[0] and changed[2] != etags[2]
+        assert user_client.get(urls[2]).json()['category'] is None
@@ -0,0 +1,186 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def create_review(client, title, score):
+    response = client.post(
+        f'/api/v1/titles/{title.id}/reviews/',
+        data={'text': 'Отзыв', 'score': score}
+    )
+    assert response.status_code == 201, (
+        'Проверьте, что POST-запрос к `/api/v1/titles/{title_id}/reviews/` '
+        'с валидными данными создаёт отзыв'
+    )
+    return response.json()['id']
+
+
+def check_counters(title, scores):
+    """
+    Сверка счётчиков произведения с оценками scores и проверка
+    командой recalculate_ratings --check.
+    """
+    from reviews.models import SCORES, Title, score_field
+
+    title = Title.objects.get(pk=title.pk)
+    assert title.review_count == len(scores), (
+        'Проверьте, что review_count равен числу отзывов произведения'
+    )
+    assert title.score_sum == sum(scores), (
+        'Проверьте, что score_sum равен сумме оценок произведения'
+    )
+    assert title.rating == (sum(scores) / len(scores) if scores else None), (
+        'Проверьте, что rating равен средней оценке произведения'
+    )
+    for score in SCORES:
+        assert getattr(title, score_field(score)) == scores.count(score), (
+            f'Проверьте, что {score_field(score)} равен числу оценок {score}'
+        )
+    call_command('recalculate_ratings', '--check', stdout=StringIO())
+
+
+class TestTitleCounters:
+
+    def test_create_and_change_score(self, user_client, another_user_client,
+                                     title):
+        review_id = create_review(user_client, title, 4)
+        check_counters(title, [4])
+        create_review(another_user_client, title, 8)
+        check_counters(title, [4, 8])
+
+        response = user_client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/',
+            data={'score': 10}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменить оценку своего отзыва'
+        )
+        check_counters(title, [10, 8])
+
+        response = user_client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/',
+            data={'text': 'Новый текст'}
+        )
+        assert response.status_code == 200
+        check_counters(title, [10, 8])
+
+    def test_delete_review(self, user_client, another_user_client, title):
+        review_id = create_review(user_client, title, 3)
+        create_review(another_user_client, title, 7)
+
+        response = user_client.delete(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/'
+        )
+        assert response.status_code == 204, (
+            'Проверьте, что автор может удалить свой отзыв'
+        )
+        check_counters(title, [7])
+
+    def test_delete_user(self, admin_client, user_client,
+                         another_user_client, title):
+        from reviews.models import Comment, Review
+
+        review_id = create_review(user_client, title, 2)
+        create_review(another_user_client, title, 9)
+        another_user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/comments/',
+            data={'text': 'Комментарий'}
+        )
+
+        response = admin_client.delete('/api/v1/users/TestUser/')
+        assert response.status_code == 204, (
+            'Проверьте, что администратор может удалить пользователя'
+        )
+        assert not Review.objects.filter(pk=review_id).exists(), (
+            'Проверьте, что отзывы удалённого пользователя удаляются'
+        )
+        assert not Comment.objects.filter(review_id=review_id).exists(), (
+            'Проверьте, что комментарии к отзывам удалённого пользователя '
+            'удаляются'
+        )
+        check_counters(title, [9])
+
+    def test_delete_user_in_background(self, settings, admin_client,
+                                       user_client, another_user_client,
+                                       title):
+        from reviews.models import Review
+
+        settings.BACKGROUND_DELETE = True
+        review_id = create_review(user_client, title, 2)
+        create_review(another_user_client, title, 9)
+
+        response = admin_client.delete('/api/v1/users/TestUser/')
+        assert response.status_code == 204
+        assert admin_client.get('/api/v1/users/TestUser/').status_code == 404
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что пользователь, помеченный на удаление, '
+            'не может пользоваться API'
+        )
+        # До purge_deleted отзыв пользователя виден и учтён в рейтинге.
+        response = another_user_client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/'
+        )
+        assert response.status_code == 200
+        check_counters(title, [2, 9])
+
+        call_command('purge_deleted', stdout=StringIO())
+        assert not Review.objects.filter(pk=review_id).exists()
+        check_counters(title, [9])
+
+    def test_stale_instances(self, user, another_user, title):
+        from reviews.models import Review
+
+        Review.objects.create(
+            title=title, author=another_user, text='Отзыв', score=5
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        # Два запроса загрузили отзыв с оценкой 5 до изменения другим.
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 7
+        first.save()
+        second.score = 9
+        second.save()
+        check_counters(title, [5, 9])
+
+        stale = Review.objects.get(pk=review.pk)
+        Review.objects.get(pk=review.pk).delete()
+        check_counters(title, [5])
+        stale.delete()
+        check_counters(title, [5])
+
+    def test_deferred_score(self, user, title):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=3
+        )
+        review = Review.objects.only('pk', 'title_id').get(pk=review.pk)
+        review.score = 8
+        review.save()
+        check_counters(title, [8])
+
+        review = Review.objects.only('pk', 'title_id').get(pk=review.pk)
+        review.text = 'Новый текст'
+        review.save()
+        check_counters(title, [8])
+
+    def test_migration_backfill(self, user, another_user, title):
+        from reviews.models import Review
+
+        Review.objects.create(
+            title=title, author=user, text='Отзыв', score=4
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Отзыв', score=10
+        )
+        # Откат к исходной схеме удаляет счётчики, миграции
+        # восстанавливают их по существующим отзывам.
+        call_command('migrate', 'reviews', '0001_initial', verbosity=0)
+        call_command('migrate', 'reviews', verbosity=0)
+        check_counters(title, [4, 10])
@@ -0,0 +1,151 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+import pytest
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, messages):
+        raise SMTPException('Сервер недоступен')
+
+
+class BlockingBackend(EmailBackend):
+    """Отправка в фоновом потоке ждёт release, удерживая пачку писем."""
+
+    claimed = threading.Event()
+    release = threading.Event()
+
+    def send_messages(self, messages):
+        if threading.current_thread() is not threading.main_thread():
+            self.claimed.set()
+            self.release.wait(10)
+        return super().send_messages(messages)
+
+
+def send_emails(*args):
+    call_command('send_emails', *args, stdout=StringIO())
+
+
+def create_emails(count):
+    from users.models import OutgoingEmail
+
+    return [
+        OutgoingEmail.objects.create(
+            subject='Тема', message=f'Письмо {number}',
+            from_email='yamdb@mail.com', recipient=f'user{number}@yamdb.fake'
+        )
+        for number in range(count)
+    ]
+
+
+class TestSendEmails:
+
+    def test_signup(self, client, mailoutbox):
+        from users.models import OutgoingEmail
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'new@yamdb.fake', 'username': 'NewUser'
+        })
+        assert response.status_code == 200
+        assert mailoutbox == [], (
+            'Проверьте, что письмо с кодом отправляется не в запросе, '
+            'а командой send_emails'
+        )
+
+        send_emails()
+        assert [message.to for message in mailoutbox] == [['new@yamdb.fake']]
+        assert 'Код подтверждения' in mailoutbox[0].body
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.SENT
+        assert email.attempts == 1 and email.sent is not None
+
+        send_emails()
+        assert len(mailoutbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    def test_retry(self, settings, mailoutbox):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_emails.FailingBackend'
+        email, = create_emails(1)
+        before = timezone.now()
+        send_emails()
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert 'SMTPException' in email.last_error
+        assert email.next_attempt >= before + timedelta(
+            seconds=settings.EMAIL_RETRY_DELAY
+        ), 'Проверьте, что неудачная отправка откладывает следующую попытку'
+
+        send_emails()
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что письмо не отправляется до next_attempt'
+        )
+
+        email.attempts = settings.EMAIL_MAX_ATTEMPTS - 1
+        email.next_attempt = timezone.now()
+        email.save()
+        send_emails()
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после EMAIL_MAX_ATTEMPTS попыток письмо '
+            'получает статус failed'
+        )
+        assert email.attempts == settings.EMAIL_MAX_ATTEMPTS
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        send_emails()
+        assert mailoutbox == []
+
+    def test_concurrent_workers(self, settings, mailoutbox):
+        from users.models import OutgoingEmail
+
+        if not connection.features.has_select_for_update_skip_locked:
+            pytest.skip('СУБД не поддерживает SELECT ... SKIP LOCKED')
+        settings.EMAIL_BACKEND = 'tests.test_emails.BlockingBackend'
+        create_emails(4)
+        BlockingBackend.claimed.clear()
+        BlockingBackend.release.clear()
+
+        def worker():
+            try:
+                send_emails('--batch-size', '2')
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        try:
+            assert BlockingBackend.claimed.wait(10)
+            # Первый воркер держит блокировку своей пачки: второй берёт
+            # только оставшиеся письма.
+            send_emails()
+        finally:
+            BlockingBackend.release.set()
+            thread.join()
+        recipients = sorted(
+            recipient for message in mailoutbox for recipient in message.to
+        )
+        expected = [f'user{number}@yamdb.fake' for number in range(4)]
+        assert recipients == expected, (
+            'Проверьте, что параллельные воркеры не отправляют одно '
+            'письмо дважды'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
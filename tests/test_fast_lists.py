@@ -0,0 +1,137 @@
+import json
+
+import pytest
+from django.utils import timezone
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def json_client(settings):
+    from rest_framework.test import APIClient
+
+    # Оба ответа должны быть построены заново, а не взяты из кэша.
+    settings.API_CACHE_TIMEOUT = 0
+    return APIClient(HTTP_ACCEPT='application/json')
+
+
+def get_responses(client, settings, url):
+    """
+    Ответ через сериализаторы и стандартный JSONRenderer и ответ
+    быстрого пути — байты, как их сравнивает check_fast_lists.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    settings.API_FAST_LISTS = False
+    response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    expected = JSONRenderer().render(response.data, 'application/json', {})
+    settings.API_FAST_LISTS = True
+    response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return expected, response.content
+
+
+def check_golden(client, settings, url, results):
+    serializer, fast = get_responses(client, settings, url)
+    assert fast == serializer, (
+        f'Проверьте, что ответ быстрого пути на `{url}` побайтно '
+        f'совпадает с ответом через сериализаторы:\n'
+        f'serializer: {serializer!r}\nfast:       {fast!r}'
+    )
+    assert json.loads(fast) == {
+        'count': len(results), 'next': None, 'previous': None,
+        'results': results,
+    }, f'Проверьте содержимое ответа на `{url}`'
+
+
+def date(value):
+    return timezone.localtime(value).isoformat()
+
+
+GENRES = [
+    {'name': 'Жанр 1', 'slug': 'genre_1'},
+    {'name': 'Жанр 2', 'slug': 'genre_2'},
+    {'name': 'Жанр 3', 'slug': 'genre_3'},
+]
+CATEGORY = {'name': 'Фильм', 'slug': 'films'}
+
+
+class TestFastLists:
+
+    def test_titles(self, json_client, settings, catalog):
+        settings.TITLE_WEIGHTED_RATING = True
+        check_golden(json_client, settings, '/api/v1/titles/', [
+            {
+                'id': catalog[0].id, 'rating': 2, 'weighted_rating': 4.69,
+                'genre': GENRES, 'category': CATEGORY,
+                'name': 'Произведение 0', 'year': 2000, 'description': None,
+            },
+            {
+                'id': catalog[1].id, 'rating': 3, 'weighted_rating': 4.92,
+                'genre': GENRES[1:], 'category': None,
+                'name': 'Произведение 1', 'year': 2001,
+                'description': 'Описание',
+            },
+            {
+                'id': catalog[2].id, 'rating': 4, 'weighted_rating': 5.15,
+                'genre': GENRES[2:], 'category': CATEGORY,
+                'name': 'Произведение 2', 'year': 2002, 'description': None,
+            },
+        ])
+
+    def test_titles_filtered(self, json_client, settings, catalog):
+        for url in (
+            '/api/v1/titles/?genre=genre_1',
+            '/api/v1/titles/?year=2001',
+            '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/top/',
+            '/api/v1/titles/trending/',
+        ):
+            serializer, fast = get_responses(json_client, settings, url)
+            assert fast == serializer, (
+                f'Проверьте, что ответ быстрого пути на `{url}` побайтно '
+                f'совпадает с ответом через сериализаторы'
+            )
+
+    def test_reviews(self, json_client, settings, catalog):
+        title = catalog[1]
+        reviews = title.reviews.order_by('pk')
+        check_golden(
+            json_client, settings, f'/api/v1/titles/{title.id}/reviews/', [
+                {
+                    'id': review.id, 'author': f'author{position}',
+                    'score': position + 2, 'text': f'Отзыв {position}',
+                    'pub_date': date(review.pub_date), 'title': title.id,
+                }
+                for position, review in enumerate(reviews)
+            ]
+        )
+
+    def test_comments(self, json_client, settings, catalog):
+        title = catalog[1]
+        review = title.reviews.order_by('pk').first()
+        comments = review.comments.order_by('pk')
+        check_golden(
+            json_client, settings,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/', [
+                {
+                    'id': comment.id, 'author': comment.author.username,
+                    'text': f'Комментарий {comment.author.username}',
+                    'pub_date': date(comment.pub_date), 'review': review.id,
+                }
+                for comment in comments
+            ]
+        )
+
+    def test_genres(self, json_client, settings, catalog):
+        check_golden(json_client, settings, '/api/v1/genres/', GENRES)
+
+    def test_categories(self, json_client, settings, catalog):
+        check_golden(
+            json_client, settings, '/api/v1/categories/', [CATEGORY]
+        )
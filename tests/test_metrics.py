@@ -0,0 +1,161 @@
+import os
+import re
+import subprocess
+import sys
+from os.path import dirname
+
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+ROOT_DIR = dirname(dirname(os.path.abspath(__file__)))
+VIEW = {'view': 'TitleViewSet.list'}
+COUNT = 'yamdb_request_duration_seconds_count'
+
+
+@pytest.fixture
+def sampled(settings):
+    """Измерение каждого запроса; middleware читает настройку при старте."""
+    settings.METRICS_SAMPLE_RATE = 1
+    settings.METRICS_TOKEN = 'секрет'
+    settings.API_CACHE_TIMEOUT = 0
+    return settings
+
+
+def get_count():
+    from api.metrics import registry
+
+    return registry.get_sample_value(COUNT, VIEW) or 0
+
+
+def parse_timing(header):
+    """Метрики Server-Timing: имя и длительность в миллисекундах."""
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r'(\w+);dur=([\d.-]+)', header)
+    }
+
+
+class TestSampling:
+
+    def test_disabled(self, settings, client, catalog):
+        settings.METRICS_SAMPLE_RATE = 0
+        before = get_count()
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что при METRICS_SAMPLE_RATE = 0 запросы '
+            'не измеряются'
+        )
+        assert get_count() == before
+
+    def test_rate(self, settings, client, catalog, monkeypatch):
+        from api import middleware
+
+        settings.METRICS_SAMPLE_RATE = 0.3
+        before = get_count()
+        monkeypatch.setattr(middleware.random, 'random', lambda: 0.5)
+        assert 'Server-Timing' not in client.get('/api/v1/titles/'), (
+            'Проверьте, что измеряется только доля METRICS_SAMPLE_RATE '
+            'запросов'
+        )
+        monkeypatch.setattr(middleware.random, 'random', lambda: 0.1)
+        assert 'Server-Timing' in client.get('/api/v1/titles/')
+        assert get_count() == before + 1
+
+
+class TestServerTiming:
+
+    def test_entries(self, sampled, client, catalog, fast_lists):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        durations = parse_timing(response['Server-Timing'])
+        assert list(durations) == [
+            'total', 'db', 'serialize', 'render', 'app'
+        ]
+        assert durations['db'] > 0
+        assert durations['serialize'] > 0, (
+            'Проверьте, что время построения данных ответа измеряется '
+            'и на быстром пути, и в сериализаторах'
+        )
+        assert durations['total'] >= (
+            durations['db'] + durations['serialize'] + durations['render']
+        ) - 0.3
+        assert 'queries, 0 duplicates' in response['Server-Timing']
+
+    def test_serialize_without_db(self, sampled, client, catalog,
+                                  monkeypatch):
+        """Запросы к БД во время сериализации входят только в db."""
+        from api import middleware
+
+        recorders = []
+        recorder_class = middleware.QueryRecorder
+
+        def remember():
+            recorder = recorder_class()
+            recorders.append(recorder)
+            return recorder
+
+        monkeypatch.setattr(middleware, 'QueryRecorder', remember)
+        sampled.API_FAST_LISTS = False
+        client.get('/api/v1/titles/')
+        recorder, = recorders
+        assert 0 < recorder.serialize < recorder.serialize_time
+        assert recorder.serialize_db_time <= recorder.time
+
+
+class TestMetricsView:
+
+    def test_token(self, settings, client):
+        settings.METRICS_TOKEN = ''
+        assert client.get('/api/v1/metrics/').status_code == 404
+        settings.METRICS_TOKEN = 'секрет'
+        response = client.get(
+            '/api/v1/metrics/', HTTP_AUTHORIZATION='Bearer другой'
+        )
+        assert response.status_code == 403
+
+    def test_histograms(self, sampled, client, catalog):
+        before = get_count()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        assert get_count() == before + 2
+        response = client.get(
+            '/api/v1/metrics/', HTTP_AUTHORIZATION='Bearer секрет'
+        )
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        for name in ('duration_seconds', 'db_seconds', 'serialize_seconds',
+                     'render_seconds', 'queries', 'response_bytes'):
+            assert (
+                f'yamdb_request_{name}_bucket{{le="+Inf",'
+                f'view="TitleViewSet.list"}}' in body
+            )
+
+    def test_multiprocess(self, tmp_path):
+        """Значения разных процессов суммируются в общем каталоге."""
+        env = {
+            **os.environ,
+            'PROMETHEUS_MULTIPROC_DIR': str(tmp_path),
+            'DJANGO_SETTINGS_MODULE': 'tests.settings',
+            'PYTHONPATH': os.pathsep.join(
+                (os.path.join(ROOT_DIR, 'api_yamdb'), ROOT_DIR)
+            ),
+        }
+        setup = 'import django; django.setup(); from api import metrics; '
+        record = setup + (
+            f'metrics.record({VIEW["view"]!r}, {{"duration_seconds": 0.1}})'
+        )
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', record], env=env,
+                           check=True)
+        output = subprocess.run(
+            [sys.executable, '-c',
+             setup + 'print(metrics.render().decode())'],
+            env=env, check=True, stdout=subprocess.PIPE
+        ).stdout.decode()
+        assert f'{COUNT}{{view="TitleViewSet.list"}} 2.0' in output, (
+            'Проверьте, что с PROMETHEUS_MULTIPROC_DIR метрики '
+            'отдают сумму значений всех процессов'
+        )
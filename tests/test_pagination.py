@@ -0,0 +1,119 @@
+import json
+from base64 import b64encode
+from urllib.parse import urlsplit
+
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+NAMES = ('Альфа', 'Бета', 'Гамма')
+TITLES = 25
+
+
+@pytest.fixture
+def titles(category):
+    from reviews.models import Title
+
+    # По 8-9 произведений с одинаковым названием: страницы по 10
+    # обрываются внутри группы равных значений ключа.
+    return [
+        Title.objects.create(
+            name=NAMES[number % len(NAMES)], year=2000, category=category
+        )
+        for number in range(TITLES)
+    ]
+
+
+def get_path(url):
+    parts = urlsplit(url)
+    return f'{parts.path}?{parts.query}'
+
+
+def encode_cursor(cursor):
+    return b64encode(json.dumps(cursor).encode()).decode()
+
+
+def walk(client, url, link):
+    """
+    Обход страниц по ссылкам link: id объектов по страницам
+    и ответ на последнюю страницу.
+    """
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        data = response.json()
+        pages.append([title['id'] for title in data['results']])
+        url = data[link] and get_path(data[link])
+    return pages, data
+
+
+class TestKeysetPagination:
+
+    def test_ties(self, fast_lists, settings, user_client, titles):
+        settings.API_CACHE_TIMEOUT = 0
+        expected = [
+            title.id for title in sorted(
+                titles, key=lambda title: (title.name, title.id)
+            )
+        ]
+
+        pages, last = walk(
+            user_client, '/api/v1/titles/?pagination=cursor', 'next'
+        )
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sum(pages, []) == expected, (
+            'Проверьте, что выдача по курсору не теряет и не повторяет '
+            'объекты с одинаковым значением ключа сортировки'
+        )
+
+        back, first = walk(
+            user_client, get_path(last['previous']), 'previous'
+        )
+        assert back == pages[-2::-1], (
+            'Проверьте, что ссылки previous возвращают те же страницы '
+            'в обратном порядке'
+        )
+        assert first['next'] is not None
+
+    @pytest.mark.parametrize('cursor', (
+        'не base64',
+        encode_cursor([1, 2]),
+        encode_cursor({'r': False}),
+        encode_cursor({'r': False, 'p': ['Альфа']}),
+        encode_cursor({'r': False, 'p': ['Альфа', 'id']}),
+        encode_cursor({'r': False, 'p': ['Альфа', 2 ** 70]}),
+        encode_cursor({'r': False, 'p': ['Альфа', [1]]}),
+        b64encode(b'{"r": false, "p": ["a", NaN]}').decode(),
+    ))
+    def test_invalid_cursor(self, user_client, titles, cursor):
+        response = user_client.get('/api/v1/titles/', {'cursor': cursor})
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный курсор возвращает статус 400'
+        )
+        assert 'cursor' in response.json()
+
+    def test_invalid_date_cursor(self, user_client, title):
+        response = user_client.get(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'cursor': encode_cursor({'r': False, 'p': ['вчера', 1]})}
+        )
+        assert response.status_code == 400
+
+    def test_page_number(self, fast_lists, settings, user_client, titles):
+        settings.API_CACHE_TIMEOUT = 0
+        response = user_client.get('/api/v1/titles/')
+        data = response.json()
+        assert data['count'] == TITLES, (
+            'Проверьте, что без `?pagination=cursor` выдача остаётся '
+            'постраничной по номеру страницы'
+        )
+        assert data['previous'] is None
+        assert 'page=2' in data['next']
+        response = user_client.get('/api/v1/titles/', {'page': 3})
+        assert len(response.json()['results']) == 5
+        assert user_client.get(
+            '/api/v1/titles/', {'page': 4}
+        ).status_code == 404
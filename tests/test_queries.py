@@ -0,0 +1,87 @@
+import pytest
+
+from .utils import assert_constant_queries
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+ADDED_OBJECTS = 5
+
+
+@pytest.fixture
+def anonymous_client():
+    from rest_framework.test import APIClient
+    return APIClient()
+
+
+def create_authors(django_user_model, prefix):
+    return [
+        django_user_model.objects.create_user(
+            username=f'{prefix}{number}',
+            email=f'{prefix}{number}@yamdb.fake'
+        )
+        for number in range(ADDED_OBJECTS)
+    ]
+
+
+class TestConstantQueries:
+
+    def test_titles(self, fast_lists, anonymous_client, title):
+        from reviews.models import Category, Genre, Title
+
+        def add_titles():
+            for number in range(ADDED_OBJECTS):
+                # Новые жанры и категории: они не должны браться
+                # из кэша справочников, прогретого первым запросом.
+                category = Category.objects.create(
+                    name=f'Категория {number}', slug=f'category_{number}'
+                )
+                new_title = Title.objects.create(
+                    name=f'Фильм {number}', year=2000, category=category
+                )
+                new_title.genre.set([
+                    Genre.objects.create(
+                        name=f'Жанр {number}-{genre}',
+                        slug=f'genre_{number}_{genre}'
+                    )
+                    for genre in range(2)
+                ])
+
+        assert_constant_queries(anonymous_client, '/api/v1/titles/', add_titles)
+
+    def test_reviews(self, fast_lists, anonymous_client, django_user_model,
+                     user, title):
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='Отзыв', score=5)
+
+        def add_reviews():
+            for author in create_authors(django_user_model, 'reviewer'):
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=7
+                )
+
+        assert_constant_queries(
+            anonymous_client, f'/api/v1/titles/{title.id}/reviews/',
+            add_reviews
+        )
+
+    def test_comments(self, fast_lists, anonymous_client, django_user_model,
+                      user, title):
+        from reviews.models import Comment, Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Комментарий')
+
+        def add_comments():
+            for author in create_authors(django_user_model, 'commenter'):
+                Comment.objects.create(
+                    review=review, author=author, text='Комментарий'
+                )
+
+        assert_constant_queries(
+            anonymous_client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            add_comments
+        )
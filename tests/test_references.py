@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def reference_cache():
+    from api.references import ReferenceCache
+    from reviews.models import Genre
+
+    cache = ReferenceCache(Genre, 'genres')
+    cache.set_version(('1',))
+    return cache
+
+
+class TestReferenceCache:
+
+    def test_cached(self, reference_cache, genres,
+                    django_assert_num_queries):
+        with django_assert_num_queries(1):
+            rows = reference_cache.get_many('slug', ('genre_1', 'missing'))
+        assert rows == {'genre_1': (genres[0].id, 'Жанр 1', 'genre_1')}
+        with django_assert_num_queries(0):
+            assert reference_cache.get('id', genres[0].id) == (
+                rows['genre_1']
+            )
+        reference_cache.set_version(('2',))
+        with django_assert_num_queries(1):
+            reference_cache.get('slug', 'genre_1')
+
+    def test_clear_during_fetch(self, reference_cache, genres,
+                                django_assert_num_queries):
+        """Очистка кэша во время запроса к БД другим потоком."""
+
+        def new_version(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            reference_cache.set_version(('2',))
+            return result
+
+        with connection.execute_wrapper(new_version):
+            row = reference_cache.get('slug', 'genre_1')
+        assert row == (genres[0].id, 'Жанр 1', 'genre_1'), (
+            'Проверьте, что прочитанная строка возвращается'
+        )
+        with django_assert_num_queries(1):
+            reference_cache.get('slug', 'genre_1')
+        assert reference_cache.rows.data, (
+            'Проверьте, что строка, прочитанная после очистки, кэшируется'
+        )
@@ -0,0 +1,58 @@
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+class TestRepeatedQueries:
+
+    def test_lists(self, fast_lists, checked_client, catalog):
+        title = catalog[0]
+        review = title.reviews.first()
+        for url in (
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        ):
+            response = checked_client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+            )
+            assert response.json()['results'], (
+                f'Проверьте, что GET-запрос к `{url}` возвращает объекты'
+            )
+
+    def test_details(self, checked_client, catalog):
+        title = catalog[0]
+        review = title.reviews.first()
+        comment = review.comments.first()
+        for url in (
+            f'/api/v1/titles/{title.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            f'{comment.id}/',
+        ):
+            response = checked_client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+            )
+
+    def test_title_writes(self, admin, catalog, genres):
+        from tests.fixtures.fixture_user import get_client
+        from tests.utils import QueryCheckingClient
+
+        client = get_client(admin, QueryCheckingClient)
+        data = {
+            'name': 'Новое произведение', 'year': 2001,
+            'category': 'films', 'genre': [genre.slug for genre in genres],
+        }
+        response = client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что администратор может создать произведение'
+        )
+        response = client.patch(
+            f'/api/v1/titles/{response.json()["id"]}/',
+            data={'genre': [genres[0].slug]}
+        )
+        assert response.status_code == 200
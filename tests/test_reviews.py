@@ -0,0 +1,31 @@
+import pytest
+from django.db import IntegrityError
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+class TestReviewCreate:
+
+    def test_second_review(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(url, data=data).status_code == 201
+        response = user_client.post(url, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв автора на произведение '
+            'возвращает статус 400'
+        )
+        assert 'non_field_errors' in response.json()
+
+    def test_other_integrity_error(self, monkeypatch, user_client, title):
+        from reviews.models import Review
+
+        def save(*args, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(Review, 'save', save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Отзыв', 'score': 5}
+            )
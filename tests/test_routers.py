@@ -0,0 +1,124 @@
+import time
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.filterwarnings('ignore:Overriding setting DATABASES'),
+]
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """
+    Вторая БД SQLite в роли реплики. Данные в неё попадают только
+    вызовом sync — как у реплики, отстающей от основной БД.
+    """
+    from api_yamdb.routers import REPLICA
+
+    if connections['default'].vendor != 'sqlite':
+        pytest.skip('Копия основной БД в реплику делается средствами SQLite')
+    settings.API_CACHE_TIMEOUT = 0
+    settings.REPLICA_STICKY_SECONDS = 1
+    settings.DATABASES = {
+        **settings.DATABASES,
+        REPLICA: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(tmp_path / 'replica.sqlite3'),
+        },
+    }
+    connections.databases[REPLICA] = settings.DATABASES[REPLICA]
+
+    def sync():
+        for alias in ('default', REPLICA):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(
+            connections[REPLICA].connection
+        )
+
+    yield sync
+    connections[REPLICA].close()
+    del connections.databases[REPLICA]
+    delattr(connections._connections, REPLICA)
+
+
+def get_slugs(client):
+    response = client.get('/api/v1/genres/')
+    assert response.status_code == 200
+    return {genre['slug'] for genre in response.json()['results']}
+
+
+class TestReplicaRouter:
+
+    def test_reads(self, client, genres, replica):
+        from reviews.models import Genre
+
+        replica()
+        Genre.objects.using('replica').create(name='Реплика', slug='replica')
+        with CaptureQueriesContext(connections['replica']) as context:
+            slugs = get_slugs(client)
+        assert 'replica' in slugs and context.captured_queries, (
+            'Проверьте, что безопасные запросы читают данные с реплики'
+        )
+
+    def test_writes(self, admin_client, client, genres, replica):
+        from api_yamdb.routers import ReplicaRouter, read_from_replica
+        from reviews.models import Genre
+
+        replica()
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == 201
+        assert Genre.objects.using('default').filter(slug='new').exists()
+        assert not Genre.objects.using('replica').filter(
+            slug='new'
+        ).exists(), 'Проверьте, что запись идёт в основную БД'
+
+        router = ReplicaRouter()
+        read_from_replica(True)
+        try:
+            assert router.db_for_read(Genre) == 'replica'
+            assert router.db_for_write(Genre) == 'default'
+        finally:
+            read_from_replica(False)
+        assert router.allow_migrate('default', 'reviews')
+        assert not router.allow_migrate('replica', 'reviews'), (
+            'Проверьте, что миграции не применяются к реплике'
+        )
+
+    def test_sticky_after_write(self, admin_client, client, genres,
+                                replica):
+        replica()
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == 201
+        assert 'new' in get_slugs(admin_client), (
+            'Проверьте, что после записи клиент читает с основной БД '
+            'и видит свои изменения'
+        )
+        assert 'new' not in get_slugs(client), (
+            'Проверьте, что другие клиенты продолжают читать с реплики'
+        )
+        time.sleep(1.1)
+        assert 'new' not in get_slugs(admin_client), (
+            'Проверьте, что после REPLICA_STICKY_SECONDS клиент снова '
+            'читает с реплики'
+        )
+
+    def test_without_replica(self, client, genres):
+        from api_yamdb.routers import ReplicaRouter, read_from_replica
+        from reviews.models import Genre
+
+        read_from_replica(True)
+        try:
+            assert ReplicaRouter().db_for_read(Genre) == 'default', (
+                'Проверьте, что без настроенной реплики чтения идут '
+                'в основную БД'
+            )
+        finally:
+            read_from_replica(False)
+        assert get_slugs(client) == {genre.slug for genre in genres}
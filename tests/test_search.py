@@ -0,0 +1,88 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+class TestTitleSearch:
+
+    def test_search(self, fast_lists, user_client, category):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Звёздные войны', year=1977, category=category,
+            description='Космическая опера'
+        )
+        Title.objects.create(
+            name='Солярис', year=1972, category=category,
+            description='Звёздная станция над океаном'
+        )
+        renamed = Title.objects.create(
+            name='Сталкер', year=1979, category=category
+        )
+
+        response = user_client.get('/api/v1/titles/', {'search': 'звёздн'})
+        assert response.status_code == 200
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Звёздные войны', 'Солярис'], (
+            'Проверьте, что поиск находит произведения по префиксу слова '
+            'и совпадения в названии идут выше совпадений в описании'
+        )
+
+        renamed.name = 'Звёздный путь'
+        renamed.save()
+        response = user_client.get('/api/v1/titles/', {'search': 'путь'})
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Звёздный путь'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'названия произведения'
+        )
+
+        response = user_client.get('/api/v1/titles/', {'search': '!!'})
+        assert response.json()['results'] == [], (
+            'Проверьте, что запрос без слов ничего не находит'
+        )
+
+
+def get_triggers():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Триггеры поиска есть только в SQLite'
+)
+class TestSearchMigrations:
+
+    def test_triggers(self):
+        from reviews.search_index import SQLITE_TRIGGERS
+
+        assert set(SQLITE_TRIGGERS) <= get_triggers(), (
+            'Проверьте, что миграции, меняющие поля Title, сохраняют '
+            'триггеры поиска (reviews.search_index.keep_search_triggers)'
+        )
+
+    def test_rollback(self, category):
+        from reviews.models import Title
+        from reviews.search import search_titles
+        from reviews.search_index import SQLITE_TRIGGERS
+
+        Title.objects.create(name='Солярис', year=1972, category=category)
+        call_command('migrate', 'reviews', '0004_title_search', verbosity=0)
+        try:
+            assert set(SQLITE_TRIGGERS) <= get_triggers(), (
+                'Проверьте, что откат миграций, меняющих поля Title, '
+                'сохраняет триггеры поиска'
+            )
+        finally:
+            call_command('migrate', 'reviews', verbosity=0)
+        assert set(SQLITE_TRIGGERS) <= get_triggers()
+        Title.objects.create(name='Сталкер', year=1979, category=category)
+        assert [
+            title.name
+            for title in search_titles(Title.objects.all(), 'сталкер')
+        ] == ['Сталкер']
@@ -0,0 +1,105 @@
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def histogram(*scores):
+    return {str(score): scores.count(score) for score in range(1, 11)}
+
+
+class TestTitleStats:
+
+    def test_stats(self, client, catalog):
+        response = client.get(f'/api/v1/titles/{catalog[0].id}/stats/')
+        assert response.status_code == 200
+        assert response.json() == {
+            'id': catalog[0].id,
+            'count': 3,
+            'histogram': histogram(1, 2, 3),
+            'mean': 2.0,
+            'median': 2,
+            'weighted_rating': 4.69,
+        }, (
+            'Проверьте, что `/api/v1/titles/{id}/stats/` возвращает '
+            'гистограмму оценок, среднее, медиану и взвешенный рейтинг'
+        )
+
+    def test_even_median(self, client, user, another_user, title):
+        from reviews.models import Review
+
+        for author, score in ((user, 3), (another_user, 10)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        data = client.get(f'/api/v1/titles/{title.id}/stats/').json()
+        assert data['histogram'] == histogram(3, 10)
+        assert data['median'] == 6.5, (
+            'Проверьте, что при чётном числе оценок медиана — среднее '
+            'двух средних оценок'
+        )
+        assert data['mean'] == 6.5
+
+    def test_no_reviews(self, client, title):
+        data = client.get(f'/api/v1/titles/{title.id}/stats/').json()
+        assert data['count'] == 0
+        assert data['histogram'] == histogram()
+        assert data['mean'] is None and data['median'] is None
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+
+    def test_bulk(self, client, catalog, django_assert_num_queries):
+        ids = [catalog[2].id, 0, catalog[0].id, catalog[2].id]
+        with django_assert_num_queries(1):
+            response = client.get(
+                '/api/v1/titles/stats/', {'ids': ','.join(map(str, ids))}
+            )
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [stats['id'] for stats in results] == [
+            catalog[2].id, catalog[0].id
+        ], (
+            'Проверьте, что статистика возвращается в порядке ids '
+            'без повторов и несуществующих произведений'
+        )
+        assert results[0]['histogram'] == histogram(3, 4, 5)
+        assert results[0]['median'] == 4
+
+    def test_bulk_max_ids(self, settings, client, catalog):
+        ids = ','.join(str(pk) for pk in range(1, settings.STATS_MAX_IDS + 1))
+        assert client.get(
+            '/api/v1/titles/stats/', {'ids': ids}
+        ).status_code == 200
+        response = client.get(
+            '/api/v1/titles/stats/', {'ids': f'{ids},{ids}'}
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что запрос статистики больше чем STATS_MAX_IDS '
+            'произведений отклоняется'
+        )
+        assert 'ids' in response.json()
+        response = client.get('/api/v1/titles/stats/', {'ids': '1,два'})
+        assert response.status_code == 400
+
+
+class TestWeightedRating:
+
+    def test_hidden_by_default(self, client, catalog, fast_lists):
+        for url in (
+            '/api/v1/titles/', '/api/v1/titles/top/',
+            f'/api/v1/titles/{catalog[0].id}/',
+        ):
+            data = client.get(url).json()
+            for title in data.get('results', [data]):
+                assert 'weighted_rating' not in title, (
+                    'Проверьте, что без TITLE_WEIGHTED_RATING '
+                    'произведения выводятся без weighted_rating'
+                )
+
+    def test_enabled(self, settings, client, catalog, fast_lists):
+        settings.TITLE_WEIGHTED_RATING = True
+        settings.API_CACHE_TIMEOUT = 0
+        data = client.get(f'/api/v1/titles/{catalog[1].id}/').json()
+        assert data['weighted_rating'] == 4.92
+        results = client.get('/api/v1/titles/').json()['results']
+        assert [title['weighted_rating'] for title in results] == [
+            4.69, 4.92, 5.15
+        ]
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from django.http import StreamingHttpResponse
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def get_lines(client, url, **params):
+    response = client.get(url, {'format': 'ndjson', 'stream': 1, **params})
+    assert response.status_code == 200
+    assert isinstance(response, StreamingHttpResponse), (
+        'Проверьте, что `?format=ndjson&stream=1` отдаёт список потоком'
+    )
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    content = b''.join(response.streaming_content).decode()
+    assert not content or content.endswith('\n')
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class TestStreaming:
+
+    def test_titles(self, settings, client, catalog):
+        settings.STREAM_CHUNK_SIZE = 2
+        lines = get_lines(client, '/api/v1/titles/')
+        assert [line['id'] for line in lines] == [
+            title.id for title in catalog
+        ], (
+            'Проверьте, что поток содержит по одному произведению '
+            'на строку во всех пачках'
+        )
+        settings.API_CACHE_TIMEOUT = 0
+        page = client.get('/api/v1/titles/', HTTP_ACCEPT='application/json')
+        assert lines == page.json()['results'], (
+            'Проверьте, что строки потока совпадают с объектами списка'
+        )
+
+    def test_filters(self, client, catalog):
+        lines = get_lines(client, '/api/v1/titles/', genre='genre_1')
+        assert [line['id'] for line in lines] == [catalog[0].id], (
+            'Проверьте, что поток учитывает фильтры списка'
+        )
+        assert get_lines(client, '/api/v1/titles/', year=1900) == []
+
+    def test_nested(self, settings, client, catalog):
+        settings.STREAM_CHUNK_SIZE = 1
+        title = catalog[1]
+        reviews = get_lines(client, f'/api/v1/titles/{title.id}/reviews/')
+        assert {review['id'] for review in reviews} == set(
+            title.reviews.values_list('id', flat=True)
+        )
+        assert {review['title'] for review in reviews} == {title.id}
+        review = reviews[0]['id']
+        comments = get_lines(
+            client, f'/api/v1/titles/{title.id}/reviews/{review}/comments/'
+        )
+        assert len(comments) == 3
+        assert {comment['review'] for comment in comments} == {review}
+
+    def test_page_without_stream(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'format': 'ndjson'})
+        assert response.status_code == 200
+        assert not response.streaming, (
+            'Проверьте, что без stream=1 в формате NDJSON отдаётся '
+            'одна страница'
+        )
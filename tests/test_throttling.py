@@ -0,0 +1,77 @@
+import pytest
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def token_rate(settings, monkeypatch):
+    """Три запроса к /auth/token/ в минуту и пустые вёдра."""
+    from api import throttling
+
+    monkeypatch.setattr(throttling, '_buckets', {})
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+            'token': '3/min',
+        },
+    }
+    return 3
+
+
+def get_token(client, username, ip):
+    return client.post(
+        TOKEN_URL,
+        data={'username': username, 'confirmation_code': 'неверный'},
+        REMOTE_ADDR=ip
+    )
+
+
+class TestTokenThrottle:
+
+    def test_retry_after(self, client, token_rate):
+        for _ in range(token_rate):
+            response = get_token(client, 'TestUser', '10.0.0.1')
+            assert response.status_code != 429
+        response = get_token(client, 'TestUser', '10.0.0.1')
+        assert response.status_code == 429, (
+            'Проверьте, что после исчерпания ведра запрос отклоняется '
+            'со статусом 429'
+        )
+        assert 0 < int(response['Retry-After']) <= 60 / token_rate, (
+            'Проверьте, что ответ 429 сообщает время до появления токена '
+            'в заголовке Retry-After'
+        )
+
+    def test_username_bucket(self, client, token_rate):
+        for number in range(token_rate):
+            get_token(client, 'TestUser', f'10.0.0.{number}')
+        assert get_token(
+            client, 'TestUser', '10.0.1.1'
+        ).status_code == 429, (
+            'Проверьте, что подбор кода для одного имени пользователя '
+            'с разных IP ограничивается ведром этого имени'
+        )
+        assert get_token(client, 'OtherUser', '10.0.1.1').status_code != 429
+
+    def test_ip_bucket(self, client, token_rate):
+        for number in range(token_rate):
+            get_token(client, f'user{number}', '10.0.0.1')
+        assert get_token(client, 'OtherUser', '10.0.0.1').status_code == 429, (
+            'Проверьте, что запросы с одного IP ограничиваются ведром IP '
+            'независимо от имени пользователя'
+        )
+        assert get_token(client, 'OtherUser', '10.0.0.2').status_code != 429
+
+    def test_no_queries(self, client, user, token_rate,
+                        django_assert_num_queries):
+        for _ in range(token_rate):
+            get_token(client, user.username, '10.0.0.1')
+        with django_assert_num_queries(0):
+            response = get_token(client, user.username, '10.0.0.1')
+        assert response.status_code == 429, (
+            'Проверьте, что запрос сверх лимита отклоняется до обращения '
+            'к БД'
+        )
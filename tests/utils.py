@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.queries import RepeatedQueries
+
+
+def count_queries(client, url):
+    """
+    Количество SQL-запросов, выполненных при GET-запросе к url.
+    Кэш ответов отключается, чтобы запрос дошёл до БД.
+    """
+    with override_settings(API_CACHE_TIMEOUT=0), \
+            CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return len(context)
+
+
+def assert_constant_queries(client, url, add_objects, expected=None):
+    """
+    Проверка, что число запросов к эндпоинту не зависит от количества
+    объектов на странице: add_objects должен добавить объекты в выдачу url.
+    """
+    before = count_queries(client, url)
+    add_objects()
+    after = count_queries(client, url)
+    assert before == after, (
+        f'Проверьте, что число запросов к `{url}` не растёт вместе с '
+        f'количеством объектов на странице: было {before}, стало {after}'
+    )
+    if expected is not None:
+        assert after == expected, (
+            f'Проверьте, что запрос к `{url}` выполняет {expected} '
+            f'SQL-запросов, сейчас: {after}'
+        )
+
+
+class QueryCheckingClient(APIClient):
+    """
+    Тестовый клиент, который проверяет каждый запрос на N+1: запрос
+    одной формы, выполненный threshold раз и больше, валит тест
+    с указанием поля сериализатора, из-за которого он повторяется.
+    """
+
+    def __init__(self, *args, threshold=2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+
+    def request(self, **request):
+        queries = RepeatedQueries(self.threshold)
+        with override_settings(API_CACHE_TIMEOUT=0), queries.watch():
+            response = super().request(**request)
+        report = queries.get_report()
+        assert not report, (
+            f'Проверьте, что {request["REQUEST_METHOD"]}-запрос к '
+            f'`{request["PATH_INFO"]}` не повторяет запросы к БД '
+            f'для каждого объекта:\n{report}'
+        )
+        return response